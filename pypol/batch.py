@@ -0,0 +1,356 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+Author: Michele Lacchia <michelelacchia@gmail.com>
+Copyright: 2010-2011 Michele Lacchia
+License: GNU GPL
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+
+This module runs the same operation over many polynomials in a pool of processes
+
+Copyright (C) 2010-2011 Michele Lacchia
+'''
+
+import ctypes
+import operator
+import itertools
+import traceback
+import multiprocessing
+import multiprocessing.sharedctypes
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+
+import roots as _roots
+from core import Polynomial, _kernel_dict, _kernel_from_dict, _from_kernel
+
+__all__ = ['Failure', 'map_op', 'map_eval', 'map_roots', 'mul']
+
+## The chunks handed to the workers are lists of items, every item a polynomial or a tuple of arguments.
+## They are pickled, and the polynomials are pickled with Polynomial.to_bytes (see Polynomial.__reduce__):
+## a polynomial travels in its compact encoding, and it is rebuilt lazily on the other side.
+_CHUNKS_PER_WORKER = 4
+
+## In the multiplication every tuple of exponents is packed into a single integer, with a mixed radix large enough
+## for the exponents of the product, so that the exponents of a product of terms are the sum of two integers.
+## If the packed exponents fit into 64 bits they are handed to the workers in shared memory.
+_MAX_PACKED = 2 ** 63
+_mul_operands = None
+
+
+class Failure(object):
+    '''
+    Takes the place of the result of an item whose operation raised an exception. The exception itself is not
+    kept, since it may not survive the trip back from the worker process::
+
+        >>> from pypol.batch import map_op
+        >>> map_op('__div__', [(x**2, x), (x, NULL)], workers=1)
+        [+ x, Failure(1, 'ZeroDivisionError', 'polynomial division or modulo by zero')]
+
+    .. attribute:: index
+
+        The position of the item in the input.
+
+    .. attribute:: type
+
+        The name of the class of the exception.
+
+    .. attribute:: message
+
+        The message of the exception.
+
+    .. attribute:: traceback
+
+        The formatted traceback, as a string.
+
+    .. versionadded:: 0.6
+    '''
+
+    __slots__ = ('index', 'type', 'message', 'traceback')
+
+    def __init__(self, index, type, message, traceback=''):
+        self.index = index
+        self.type = type
+        self.message = message
+        self.traceback = traceback
+
+    def __getstate__(self):
+        return (self.index, self.type, self.message, self.traceback)
+
+    def __setstate__(self, state):
+        self.index, self.type, self.message, self.traceback = state
+
+    def __eq__(self, other):
+        return isinstance(other, Failure) and self.__getstate__() == other.__getstate__()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Failure({0}, {1!r}, {2!r})'.format(self.index, self.type, self.message)
+
+
+def _call(op, item, args, kwargs):
+    if not isinstance(item, tuple):
+        item = (item,)
+    if isinstance(op, basestring): ## A method of the first argument
+        return getattr(item[0], op)(*(item[1:] + args), **kwargs)
+    return op(*(item + args), **kwargs)
+
+def _run_chunk(task):
+    '''
+    Runs in the workers: applies the operation to every item of the chunk, an exception is turned into a
+    :class:`Failure` and the next item is processed.
+    '''
+
+    op, args, kwargs, start, items = task
+    results = []
+    for i, item in enumerate(items):
+        try:
+            results.append(_call(op, item, args, kwargs))
+        except Exception, e:
+            results.append(Failure(start + i, type(e).__name__, str(e), traceback.format_exc()))
+    return results
+
+def _eval_item(poly, points, letters):
+    f = poly.evaluator(letters)
+    n = len(f.letters)
+    return [f(*(point if n > 1 else (point,) * n)) for point in points]
+
+def _dispatch(op, items, args, kwargs, chunksize, workers):
+    items = list(items)
+    if not items:
+        return []
+    if chunksize is None:
+        chunksize = max(1, len(items) // ((workers or multiprocessing.cpu_count()) * _CHUNKS_PER_WORKER))
+    tasks = [(op, args, kwargs, i, items[i:i + chunksize]) for i in xrange(0, len(items), chunksize)]
+    if workers == 1: ## No pool, useful to debug the operation
+        chunks = map(_run_chunk, tasks)
+    elif ProcessPoolExecutor is not None:
+        with ProcessPoolExecutor(workers) as executor:
+            chunks = list(executor.map(_run_chunk, tasks))
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            chunks = pool.map(_run_chunk, tasks, 1)
+        finally:
+            pool.close()
+            pool.join()
+    return [result for chunk in chunks for result in chunk]
+
+def map_op(op, items, args=(), kwargs=None, chunksize=None, workers=None):
+    '''
+    Applies the operation *op* to all the *items*, in a pool of processes, and returns the list of the results in the
+    same order. An item is a polynomial, or a tuple with the arguments of the operation::
+
+        >>> from pypol.batch import map_op
+        >>> from pypol.series import chebyshev_t
+        >>> polys = [chebyshev_t(n) for n in xrange(1, 5)]
+        >>> map_op('derivative', polys, (2,))
+        [, + 4, + 24x, + 96x^2 - 16]
+        >>> map_op(gcd, [(x**2 - 1, x**2 + 2*x + 1), (x**3, x**2)])
+        [- 2x - 2, + x^2]
+
+    *op* is the name of a method of the first argument, or a function defined at the top level of a module, so that it
+    can be sent to the workers; *args* and *kwargs* are appended to the arguments of every call.
+    The items are split into chunks of *chunksize* items (by default, every worker gets about 4 chunks), and each
+    chunk is handed to a process. If the :mod:`concurrent.futures` module is available the pool is a
+    :class:`concurrent.futures.ProcessPoolExecutor`, otherwise a :class:`multiprocessing.Pool`; if *workers* is 1
+    the operation runs in the current process.
+
+    The polynomials are pickled with their compact encoding (see :meth:`pypol.Polynomial.to_bytes`), both on the way to
+    the workers and on the way back.
+
+    An exception raised by an item does not stop the others: its result is a :class:`Failure`.
+
+    :param integer chunksize: the number of items sent to a process at once
+    :param integer workers: the number of processes (default to the number of CPUs)
+    :rtype: list
+
+    .. versionadded:: 0.6
+    '''
+
+    return _dispatch(op, items, tuple(args), kwargs or {}, chunksize, workers)
+
+def map_eval(polys, points, letters=None, chunksize=None, workers=None):
+    '''
+    Evaluates every polynomial of *polys* at all the *points*, with exact arithmetic, and returns the list of the
+    lists of the values. As in :meth:`pypol.AlgebraicFraction.eval_many`, the points are numbers for univariate
+    polynomials, otherwise tuples with the values of *letters* (default to the :attr:`~pypol.Polynomial.letters` of
+    every polynomial)::
+
+        >>> from pypol.batch import map_eval
+        >>> map_eval([poly1d([1, 0, -2]), poly1d([3, 1])], [0, 1, 2])
+        [[-2, -1, 2], [1, 4, 7]]
+        >>> map_eval([polynomial('xy - 1/2'), polynomial('x - y')], [(1, 2), (3, 4)], 'xy')
+        [[Fraction(3, 2), Fraction(23, 2)], [-1, -1]]
+
+    Every polynomial is turned into a Horner's scheme once, with :meth:`pypol.Polynomial.evaluator`. The other
+    arguments are the same as in :func:`map_op`.
+
+    .. versionadded:: 0.6
+    '''
+
+    return _dispatch(_eval_item, polys, (tuple(points), letters), {}, chunksize, workers)
+
+def map_roots(polys, method='durand_kerner', chunksize=None, workers=None, **kwargs):
+    '''
+    Finds the roots of all the polynomials *polys* with *method*, the name of a function of :mod:`pypol.roots` (or any
+    function with the same interface), and returns the list of the results::
+
+        >>> from pypol.batch import map_roots
+        >>> map_roots([poly1d([1, 0, -4]), poly1d([1, -3, 2])], 'ruffini')
+        [[-2, 2], [1, 2]]
+        >>> map_roots([poly1d([1, 0, -2])], 'newton', start=1, epsilon=1e-12)
+        [1.4142135623730951]
+
+    The keyword arguments are passed to *method*, the other arguments are the same as in :func:`map_op`.
+
+    .. versionadded:: 0.6
+    '''
+
+    if isinstance(method, basestring):
+        method = getattr(_roots, method)
+    return _dispatch(method, polys, (), kwargs, chunksize, workers)
+
+def _pack_exponents(a, b):
+    '''
+    Returns the packing of the exponents of the sparse polynomials *a* and *b*: the minimum exponents of each operand
+    and the radices.
+    '''
+
+    lo_a, hi_a = map(min, zip(*a)), map(max, zip(*a))
+    lo_b, hi_b = map(min, zip(*b)), map(max, zip(*b))
+    radices = [ha - la + hb - lb + 1 for la, ha, lb, hb in zip(lo_a, hi_a, lo_b, hi_b)]
+    return lo_a, lo_b, radices
+
+def _pack(exps, lo, radices):
+    key = 0
+    for e, l, r in reversed(zip(exps, lo, radices)):
+        key = key * r + e - l
+    return key
+
+def _unpack(keys, lo, radices):
+    '''
+    Unpacks all the *keys* at once, one letter at a time.
+    '''
+
+    columns = []
+    for l, r in zip(lo, radices):
+        columns.append([k % r + l for k in keys])
+        keys = [k // r for k in keys]
+    if not columns:
+        return [()] * len(keys)
+    return zip(*columns)
+
+def _add_partial(product, partial):
+    get = product.get
+    for k, c in partial.iteritems():
+        product[k] = get(k, 0) + c
+    return product
+
+def _init_mul(keys_a, coeffs_a, keys_b, coeffs_b):
+    global _mul_operands
+    ## The second operand is read by every block: it is copied once into the worker
+    _mul_operands = (keys_a, coeffs_a, zip(keys_b[:], coeffs_b))
+
+def _mul_block(bounds):
+    start, end = bounds
+    keys_a, coeffs_a, terms_b = _mul_operands
+    r = {}
+    get = r.get
+    for ka, ca in zip(keys_a[start:end], coeffs_a[start:end]):
+        for kb, cb in terms_b:
+            k = ka + kb
+            r[k] = get(k, 0) + ca * cb
+    return r
+
+def _mul_here(operands, blocks):
+    global _mul_operands
+    _init_mul(*operands)
+    try:
+        return reduce(_add_partial, itertools.imap(_mul_block, blocks))
+    finally:
+        _mul_operands = None
+
+def mul(p, q, chunksize=None, workers=None):
+    '''
+    Returns the product of the polynomials *p* and *q*, computed by a pool of processes: the larger operand is split
+    into blocks of *chunksize* terms, every worker multiplies its blocks by the other operand, and the partial products
+    are added up by exponents. It is meant for large sparse polynomials in many letters, where ``p * q`` runs on a
+    single core::
+
+        >>> from pypol.batch import mul
+        >>> from pypol.funcs import random_poly
+        >>> p = random_poly(len_=2000, letters='xyzw', max_letters=4, exp_range=xrange(20))
+        >>> q = random_poly(len_=2000, letters='xyzw', max_letters=4, exp_range=xrange(20))
+        >>> mul(p, q) == p * q
+        True
+
+    The exponents of every term are packed into a single integer; the arrays of the packed exponents are shared with
+    the workers (if they fit into 64 bits), while the coefficients are passed when the workers are started, so no
+    polynomial is pickled block by block. The pool is a :class:`multiprocessing.Pool`; if *workers* is 1 the blocks
+    are multiplied in the current process.
+
+    :param integer chunksize: the number of terms of a block (by default, every worker gets about 4 blocks)
+    :param integer workers: the number of processes (default to the number of CPUs)
+    :rtype: :class:`pypol.Polynomial`
+
+    .. versionadded:: 0.6
+    '''
+
+    pinned = p._pinned or q._pinned
+    letters = tuple(sorted(set(p.letters) | set(q.letters)))
+    a = _kernel_dict(p._get_kernel(), letters)
+    b = _kernel_dict(q._get_kernel(), letters)
+    if not a or not b:
+        return Polynomial()
+    if len(a) < len(b):
+        a, b = b, a
+    lo_a, lo_b, radices = _pack_exponents(a, b)
+    coeffs_a, coeffs_b = a.values(), b.values()
+    keys_a = [_pack(exps, lo_a, radices) for exps in a]
+    keys_b = [_pack(exps, lo_b, radices) for exps in b]
+    if reduce(operator.mul, radices, 1) <= _MAX_PACKED:
+        keys_a = multiprocessing.sharedctypes.RawArray(ctypes.c_longlong, keys_a)
+        keys_b = multiprocessing.sharedctypes.RawArray(ctypes.c_longlong, keys_b)
+    operands = (keys_a, coeffs_a, keys_b, coeffs_b)
+
+    if chunksize is None:
+        chunksize = max(1, len(a) // ((workers or multiprocessing.cpu_count()) * _CHUNKS_PER_WORKER))
+    blocks = [(i, min(i + chunksize, len(a))) for i in xrange(0, len(a), chunksize)]
+    if workers == 1:
+        product = _mul_here(operands, blocks)
+    else:
+        pool = multiprocessing.Pool(workers, _init_mul, operands)
+        try:
+            ## The partial products are merged as soon as they arrive
+            product = reduce(_add_partial, pool.imap_unordered(_mul_block, blocks))
+        finally:
+            pool.close()
+            pool.join()
+
+    lo = [la + lb for la, lb in zip(lo_a, lo_b)]
+    keys = [k for k, c in product.iteritems() if c]
+    d = dict(zip(_unpack(keys, lo, radices), [product[k] for k in keys]))
+    return _from_kernel(_kernel_from_dict(d, letters, pinned), pinned)
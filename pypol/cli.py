@@ -0,0 +1,254 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+Author: Michele Lacchia <michelelacchia@gmail.com>
+Copyright: 2010-2011 Michele Lacchia
+License: GNU GPL
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+
+This module implements the pypol command, which applies a pipeline of operations to a stream of polynomials
+
+Copyright (C) 2010-2011 Michele Lacchia
+'''
+
+import sys
+import shlex
+import optparse
+import itertools
+import fileinput
+import collections
+import multiprocessing
+
+from pypol import roots
+from pypol.core import polynomial, _parse_coeff
+
+__all__ = ['main']
+
+_USAGE = '''%prog [options] [FILE ...]
+
+Reads the polynomials from the files (or from the standard input), one per
+line, applies the operations in the order they are given and writes one line
+for every polynomial. The operations are:
+
+    simplify
+    derive [--order K] [--letter L]
+    roots [--method NAME] [--start X] [--epsilon E]
+    eval [--points FILE] [--at POINT ...] [--letters LETTERS]
+
+roots and eval must be the last operation. For example:
+
+    %prog -d derive -d "roots --method laguerre --start 1" polys.txt'''
+
+## The lines are handed to the workers in windows of _WINDOW_CHUNKS chunks per worker, and at most two windows are
+## in flight: the memory used does not depend on the size of the input.
+_WINDOW_CHUNKS = 8
+_pipeline = None
+
+
+def _parse_number(s):
+    s = s.strip()
+    try:
+        return _parse_coeff(s)
+    except ValueError:
+        return complex(s)
+
+def _parse_point(s):
+    values = [_parse_number(v) for v in s.replace(',', ' ').split()]
+    return values[0] if len(values) == 1 else tuple(values)
+
+def _format(v):
+    if isinstance(v, (float, complex)): ## str() would round them
+        return repr(v)
+    return str(v)
+
+def _operation_parser(name, usage):
+    return optparse.OptionParser(prog=name, usage='%prog ' + usage)
+
+def _parse_operation(text):
+    '''
+    Parses an operation of the pipeline, and returns the pair (name, arguments).
+    '''
+
+    words = shlex.split(text)
+    if not words:
+        raise optparse.OptionValueError('empty operation')
+    name, words = words[0], words[1:]
+    if name == 'simplify':
+        parser = _operation_parser(name, '')
+    elif name == 'derive':
+        parser = _operation_parser(name, '[--order K] [--letter L]')
+        parser.add_option('--order', type='int', default=1, help='the order of the derivative (default 1)')
+        parser.add_option('--letter', help='the letter (default to the max_letter of every polynomial)')
+    elif name == 'roots':
+        parser = _operation_parser(name, '[--method NAME] [--start X] [--epsilon E]')
+        parser.add_option('--method', choices=roots._METHODS, default='durand_kerner',
+                          help='a function of pypol.roots (default durand_kerner)')
+        parser.add_option('--start', help='the start value of the iterative methods')
+        parser.add_option('--epsilon', type='float', help='the precision of the iterative methods')
+    elif name == 'eval':
+        parser = _operation_parser(name, '[--points FILE] [--at POINT ...] [--letters LETTERS]')
+        parser.add_option('--points', metavar='FILE', help='read the points from FILE, one per line')
+        parser.add_option('--at', metavar='POINT', action='append', default=[],
+                          help='evaluate at POINT, e.g. 2 or "1/2, 3"')
+        parser.add_option('--letters', help='the order of the values of the points (default to the letters of every '
+                                            'polynomial)')
+    else:
+        raise optparse.OptionValueError('unknown operation: %s' % name)
+
+    options, args = parser.parse_args(words)
+    if args:
+        parser.error('unexpected arguments: %s' % ' '.join(args))
+    if name == 'derive':
+        return name, {'k': options.order, 'letter': options.letter}
+    if name == 'roots':
+        kwargs = {}
+        if options.start is not None:
+            kwargs['start'] = _parse_number(options.start)
+        if options.epsilon is not None:
+            kwargs['epsilon'] = options.epsilon
+        return name, {'method': options.method, 'kwargs': kwargs}
+    if name == 'eval':
+        points = [_parse_point(p) for p in options.at]
+        if options.points:
+            with open(options.points) as f:
+                points.extend(_parse_point(line) for line in f if line.strip())
+        if not points:
+            parser.error('no points')
+        return name, {'points': points, 'letters': options.letters}
+    return name, {}
+
+def _apply(pipeline, line):
+    '''
+    Applies the operations to the polynomial in *line*, and returns the output line.
+    '''
+
+    poly = polynomial(line)
+    for name, args in pipeline:
+        if name == 'simplify':
+            poly.simplify()
+        elif name == 'derive':
+            poly = poly.derivative(args['k'], args['letter'])
+        elif name == 'roots':
+            result = getattr(roots, args['method'])(poly, **args['kwargs'])
+            if not isinstance(result, (list, tuple)):
+                result = [result]
+            return ' '.join(map(_format, result))
+        elif name == 'eval':
+            f = poly.evaluator(args['letters'])
+            n = len(f.letters)
+            if n > 1 and not all(isinstance(p, tuple) for p in args['points']):
+                raise ValueError('the points must have %d values (%s)' % (n, ', '.join(f.letters)))
+            return ' '.join(_format(f(*(p if n > 1 else (p,) * n))) for p in args['points'])
+    return repr(poly).strip() or '0'
+
+def _init_worker(pipeline):
+    global _pipeline
+    _pipeline = pipeline
+
+def _process(item):
+    '''
+    Processes a line in a worker: returns (line number, output, error message).
+    '''
+
+    n, line = item
+    try:
+        return n, _apply(_pipeline, line), None
+    except Exception, e:
+        return n, None, '%s: %s' % (type(e).__name__, e)
+
+def _windows(iterable, size):
+    while True:
+        window = list(itertools.islice(iterable, size))
+        if not window:
+            return
+        yield window
+
+def _run(items, pipeline, workers, chunksize):
+    '''
+    Yields the results of all the *items*, in order.
+    '''
+
+    if workers == 1:
+        _init_worker(pipeline)
+        for result in itertools.imap(_process, items):
+            yield result
+        return
+    pool = multiprocessing.Pool(workers, _init_worker, (pipeline,))
+    try:
+        size = chunksize * _WINDOW_CHUNKS * (workers or multiprocessing.cpu_count())
+        pending = collections.deque()
+        for window in _windows(items, size):
+            pending.append(pool.map_async(_process, window, chunksize))
+            if len(pending) == 2:
+                for result in pending.popleft().get():
+                    yield result
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+def main(args=None):
+    '''
+    The entry point of the pypol command. Returns the exit status: 0, or 1 if some lines could not be processed.
+    '''
+
+    parser = optparse.OptionParser(prog='pypol', usage=_USAGE)
+    parser.add_option('-d', '--do', metavar='OPERATION', action='append', default=[],
+                      help='add OPERATION (with its options, quoted) to the pipeline')
+    parser.add_option('-o', '--output', metavar='FILE', help='write the results to FILE (default to the standard '
+                                                             'output)')
+    parser.add_option('-w', '--workers', type='int', default=1,
+                      help='the number of processes (default 1, 0 for the number of CPUs)')
+    parser.add_option('-c', '--chunksize', type='int', default=64,
+                      help='the number of lines sent to a process at once (default %default)')
+    options, files = parser.parse_args(args)
+
+    try:
+        pipeline = [_parse_operation(op) for op in options.do]
+    except (optparse.OptionValueError, IOError, ValueError), e:
+        parser.error(str(e))
+    if any(name in ('roots', 'eval') for name, _ in pipeline[:-1]):
+        parser.error('roots and eval must be the last operation')
+
+    lines = fileinput.input(files)
+    ## Blank lines and comments are skipped, the line numbers are kept for the error messages
+    items = ((lines.filename(), lines.filelineno(), line.strip()) for line in lines)
+    items = (('%s:%d' % (name, n), line) for name, n, line in items if line and not line.startswith('#'))
+    output = open(options.output, 'w') if options.output else sys.stdout
+    status = 0
+    try:
+        for where, result, error in _run(items, pipeline, options.workers or None, max(1, options.chunksize)):
+            if error is not None:
+                sys.stderr.write('pypol: %s: %s\n' % (where, error))
+                status = 1
+                result = ''
+            output.write(result + '\n')
+    finally:
+        lines.close()
+        if output is not sys.stdout:
+            output.close()
+    return status
+
+if __name__ == '__main__':
+    from pypol.cli import main
+    sys.exit(main())
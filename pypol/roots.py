@@ -34,9 +34,46 @@ from __future__ import division
 import math
 import cmath
 import decimal
+import fractions
 import operator
 from pypol import poly1d, monomial, Polynomial
-from funcs import polyder, divided_diff
+from funcs import divided_diff
+
+def _eval_derivs(poly, x, k):
+    ## Like poly(x), the fractions are converted into floats: the iterations must not go on with exact arithmetic
+    return [float(v) if isinstance(v, fractions.Fraction) else v for v in poly.eval_derivs(x, k)]
+
+def rational_roots(poly):
+    '''
+    Returns the rational roots of the polynomial *poly* (which must be univariate), sorted, without repetitions.
+    They are integers or :class:`fractions.Fraction` objects.
+
+    **Examples**
+
+    ::
+
+        >>> rational_roots(poly1d([6, -5, -2, 1]))
+        [Fraction(-1, 2), Fraction(1, 3), 1]
+        >>> rational_roots(poly1d([1, 0, -2]))
+        []
+
+    The roots are read from the linear factors of :meth:`pypol.Polynomial.factor`, so the divisors of the
+    coefficients are never enumerated, and large coefficients are not a problem::
+
+        >>> p = Polynomial.from_roots([10**12, -7]) * poly1d([1, 0, 1])
+        >>> rational_roots(p)
+        [-7, 1000000000000]
+
+    .. versionadded:: 0.6
+    '''
+
+    roots = []
+    for factor, k in poly.factor()[1]:
+        if factor.degree == 1:
+            a, b = factor.to_dense()
+            r = fractions.Fraction(-b, a)
+            roots.append(r.numerator if r.denominator == 1 else r)
+    return sorted(roots)
 
 def ruffini(poly):
     '''
@@ -50,7 +87,7 @@ def ruffini(poly):
         >>> p
         + x^4 + 5x^3 + 5x^2 - 5x - 6
         >>> ruffini(p)
-        [-1, 1]
+        [-3, -2, -1, 1]
         >>> p(-1), p(1)
         (0, 0)
 
@@ -60,7 +97,7 @@ def ruffini(poly):
         >>> p2, p3
         (+ x^3 + 6x^2 + 11x + 6, + x^3 + 4x^2 + x - 6)
         >>> ruffini(p2), ruffini(p3)
-        ([-1, -2, -3], [1])
+        ([-3, -2, -1], [-3, -2, 1])
         >>> p2(-1), p2(-2), p2(-3)
         (0, 0, 0)
         >>> p3(1)
@@ -77,16 +114,14 @@ def ruffini(poly):
         (((-3.5+2.3979157616563596j), (-3.5-2.3979157616563596j)), ((-4+3.3166247903553998j), (-4-3.3166247903553998j)))
 
     .. versionadded:: 0.3
+    .. versionchanged:: 0.6
+        The roots are found with :func:`rational_roots` (they used to be searched among the divisors of the
+        right-hand side, one by one, and some of them were missed), and they are sorted.
     '''
 
-    def _divs(n):
-        d = [1] + [x for x in xrange(2, n // 2 + 1)] + [n]
-        return map(operator.neg, d) + d
-
-    p = poly.right_hand_side
-    if not p:
+    if not poly.right_hand_side:
         return []
-    return [x for x in _divs(p) if not poly(x)]
+    return [r for r in rational_roots(poly) if isinstance(r, (int, long))]
 
 def quadratic(poly):
     '''
@@ -148,10 +183,7 @@ def quadratic(poly):
 
     poly = poly.filter()
     assert poly.degree == 2, 'The polynomial\'s degree must be 2'
-    if len(poly.coefficients) == 3:
-        a, b, c = poly.coefficients
-    else:
-        a, b, c = map(getattr(poly, 'get'), [2, 1, 0])
+    a, b, c = poly.coeff_vector()[::-1]
     r = b ** 2 - 4*a*c
     if r < 0:
         r = complex(imag=(-r) ** 0.5)
@@ -198,10 +230,7 @@ def cubic(poly):
 
     poly = poly.filter()
     assert poly.degree == 3, 'The polynomial\'s degree must be 3'
-    if len(poly.coefficients) == 4:
-        a, b, c, d = poly.coefficients
-    else:
-        a, b, c, d = map(getattr(poly, 'get'), [3, 2, 1, 0])
+    a, b, c, d = poly.coeff_vector()[::-1]
 
     if a == 0:
         poly = poly1d([a, b, c, d])
@@ -321,10 +350,7 @@ def quartic(poly):
     '''
 
     assert poly.degree == 4, 'The polynomial\'s degree must be 4'
-    if len(poly.coefficients) == 5:
-        a, b, c, d, e = poly.coefficients
-    else:
-        a, b, c, d, e = map(getattr(poly, 'get'), [4, 3, 2, 1, 0])
+    a, b, c, d, e = poly.coeff_vector()[::-1]
 
     poly = poly1d([a, b, c, d, e])
     if not poly(1):
@@ -348,10 +374,7 @@ def quartic(poly):
         return cubic(Polynomial(poly[1:]))
 
     poly = poly.div_all(a, int=True)
-    if len(poly.coefficients) == 5:
-        a, b, c, d, e = map(float, poly.coefficients)
-    else:
-        a, b, c, d, e = map(float, map(getattr(poly, 'get'), [4, 3, 2, 1, 0]))
+    a, b, c, d, e = map(float, poly.coeff_vector()[::-1])
 
     f = c - 3*b**2 / 8
     g = d + b**3 / 8 - b*c / 2
@@ -375,13 +398,14 @@ def quartic(poly):
     x4 = - p - q + r - s
     return x1, x2, x3, x4
 
-def newton(poly, start, epsilon=float('-inf')):
+def newton(poly, start, epsilon=float('-inf'), sqf=False):
     '''
     Finds one root of the polynomial *poly*, with this iteration formula:
         :math:`x_{n + 1} = x_n - \\frac{f(x_n)}{f'(x_n)}`
 
     :param start: the start value for evaluate ``poly(x)``.
     :param epsilon: the precision of the calculus (default to ``float('-inf')``).
+    :param sqf: if True, the root is searched in the square-free part of *poly* (see :meth:`pypol.Polynomial.sqf`)
     :type start: integer, float or complex
     :type epsilon: integer or float
     :rtype: integer of float
@@ -432,28 +456,32 @@ def newton(poly, start, epsilon=float('-inf')):
     `MathWorld <http://mathworld.wolfram.com/HalleysMethod.html>`_
 
     .. versionadded:: 0.3
+    .. versionchanged:: 0.6
+        The *sqf* parameter
     '''
 
-    poly_d = polyder(poly)
+    if sqf:
+        poly = poly.sqf()
 
     while True:
-        p_s = poly(start)
+        p_s, p_d = _eval_derivs(poly, start, 1)
         if not p_s:
             break
-        x_n = start - p_s / poly_d(start)
+        x_n = start - p_s / p_d
         if start == x_n or abs(start - x_n) < epsilon:
             break
         start = x_n
 
     return start
 
-def halley(poly, start, epsilon=float('-inf')):
+def halley(poly, start, epsilon=float('-inf'), sqf=False):
     '''
     Finds one root of the polynomial *poly* using the Halley's method, with this iteration formula:
         :math:`x_{n + 1} = x_n - \\frac{2f(x_n)f'(x_n)}{2[f'(x_n)]^2 - f(x_n)f''(x_n)}`
 
     :param start: the start value to evaluate ``poly(x)``
     :param epsilon: the precision, default to ``float('-inf')``
+    :param sqf: if True, the root is searched in the square-free part of *poly* (see :meth:`pypol.Polynomial.sqf`)
     :type start: integer, float or complex
     :type epsilon: integer or float
     :rtype: integer or float
@@ -495,22 +523,28 @@ def halley(poly, start, epsilon=float('-inf')):
     `MathWorld <http://mathworld.wolfram.com/HalleysMethod.html>`_
 
     .. versionadded:: 0.4
+    .. versionchanged:: 0.6
+        The *sqf* parameter
     '''
 
-    p_d, p_d_ = polyder(poly), polyder(poly, 2)
+    if sqf:
+        poly = poly.sqf()
+
     while True:
-        x_n = start - (2 * poly(start) * p_d(start))/(2 * p_d(start) ** 2 - poly(start) * p_d_(start))
+        p_s, p_d, p_d_ = _eval_derivs(poly, start, 2)
+        x_n = start - (2 * p_s * p_d) / (2 * p_d ** 2 - p_s * p_d_)
         if x_n == start or abs(x_n - start) < epsilon:
             return x_n
         start = x_n
 
-def householder(poly, start, epsilon=float('-inf')):
+def householder(poly, start, epsilon=float('-inf'), sqf=False):
     '''
     Finds one root of the polynomial *poly* using the Householder's method, with this iteration formula:
         :math:`x_{n + 1} = x_n - \\frac{f(x_n)}{f'(x_n)} \\Big\{ 1 + \\frac{f(x_n)f''(x_n)}{2[f'(x_n)]^2} \\Big\}`
 
     :param start: the start value to evaluate ``poly(x)``
     :param epsilon: the precision, default to ``float('-inf')``
+    :param sqf: if True, the root is searched in the square-free part of *poly* (see :meth:`pypol.Polynomial.sqf`)
     :type start: integer, float or complex
     :type epsilon: integer or float
     :rtype: integer or float
@@ -535,6 +569,12 @@ def householder(poly, start, epsilon=float('-inf')):
         >>> p(r)
         0.0
 
+    ``1`` is a double root, so the convergence is only linear. In the square-free part of the polynomial all the
+    roots are simple::
+
+        >>> householder(p, 100, sqf=True)
+        1.0
+
     if the precision is lower, the result will be worse::
 
         >>> householder(p, 100, 0.1)
@@ -554,22 +594,28 @@ def householder(poly, start, epsilon=float('-inf')):
     `MathWorld <http://mathworld.wolfram.com/HouseholdersMethod.html>`_
 
     .. versionadded:: 0.4
+    .. versionchanged:: 0.6
+        The *sqf* parameter
     '''
 
-    p_d, p_d_ = polyder(poly), polyder(poly, 2)
+    if sqf:
+        poly = poly.sqf()
+
     while True:
-        x_n = start - (poly(start)/p_d(start))*(1 + (poly(start) * p_d_(start)) / (2 * p_d(start) ** 2))
+        p_s, p_d, p_d_ = _eval_derivs(poly, start, 2)
+        x_n = start - (p_s / p_d) * (1 + (p_s * p_d_) / (2 * p_d ** 2))
         if x_n == start or abs(x_n - start) < epsilon:
             return x_n
         start = x_n
 
-def schroeder(poly, start, epsilon=float('-inf')):
+def schroeder(poly, start, epsilon=float('-inf'), sqf=False):
     '''
     Finds one root of the polynomial *poly* using the Schröder's method, with the iteration formula:
         :math:`x_{n + 1} = x_n - \\frac{f(x_n)f'(x_n)}{[f'(x_n)]^2 - f(x_n)f''(x_n)}`
 
     :param start: the start value to evaluate ``poly(x)``
     :param epsilon: the precision, default to ``float('-inf')``
+    :param sqf: if True, the root is searched in the square-free part of *poly* (see :meth:`pypol.Polynomial.sqf`)
     :type start: integer, float or complex
     :type epsilon: integer or float
     :rtype: integer or float
@@ -593,17 +639,22 @@ def schroeder(poly, start, epsilon=float('-inf')):
         (1.0964045808524712+0.5909569632973221j)
         >>> k(schroeder(k, 100))
         1.1102230246251565e-16j
+
+    .. versionchanged:: 0.6
+        The *sqf* parameter
     '''
 
-    p_d, p_d_ = polyder(poly), polyder(poly, 2)
+    if sqf:
+        poly = poly.sqf()
+
     while True:
-        ps, pd = poly(start), p_d(start)
-        x_n = start - (ps * pd) / (pd ** 2 - ps * p_d_(start))
+        ps, pd, pd_ = _eval_derivs(poly, start, 2)
+        x_n = start - (ps * pd) / (pd ** 2 - ps * pd_)
         if x_n == start or abs(x_n - start) < epsilon:
             return x_n
         start = x_n
 
-def laguerre(poly, start, epsilon=float('-inf')):
+def laguerre(poly, start, epsilon=float('-inf'), sqf=False):
     '''
     Finds one root of the polynomial *poly* using the Laguerre's method, with the iteration formula:
         :math:`x_{k + 1} = x_k - \\frac{n}{max[G \pm \sqrt{(n - 1)(nH - G^2)}]}`
@@ -616,6 +667,7 @@ def laguerre(poly, start, epsilon=float('-inf')):
 
     :param start: the start value to evaluate ``poly(x)``
     :param epsilon: the precision, default to ``float('-inf')``
+    :param sqf: if True, the root is searched in the square-free part of *poly* (see :meth:`pypol.Polynomial.sqf`)
     :type start: integer, float or complex
     :type epsilon: integer or float
     :rtype: complex
@@ -639,16 +691,22 @@ def laguerre(poly, start, epsilon=float('-inf')):
         (-0.041525780509971674+0j)
         >>> k(laguerre(k, -100))
         0j
+
+    .. versionchanged:: 0.6
+        The *sqf* parameter
     '''
 
-    p_d, p_d_, n = polyder(poly), polyder(poly, 2), poly.degree
+    if sqf:
+        poly = poly.sqf()
+
+    n = poly.degree
     start = complex(start)
     while True:
-        px = poly(start)
+        px, p_d, p_d_ = _eval_derivs(poly, start, 2)
         if not px:
             return start
-        g = p_d(start) / px
-        h = g ** 2 - p_d_(start) / px
+        g = p_d / px
+        h = g ** 2 - p_d_ / px
         dp = cmath.sqrt((n - 1) * (n * h - g**2))
         d1 = g + dp
         d2 = g - dp
@@ -810,7 +868,7 @@ def ridder(poly, x0, x1, epsilon=1e-9):
             x0, x1, p0, p1 = x2, x_k, p2, pk
         l += 1
 
-def durand_kerner(poly, start=complex(.4, .9), epsilon=1.12e-16):
+def durand_kerner(poly, start=complex(.4, .9), epsilon=1.12e-16, sqf=False):
     '''
     The Durand-Kerner method. It finds all the roots of the polynomials *poly* simultaneously.
     With some polynomials it works quite well::
@@ -876,15 +934,31 @@ def durand_kerner(poly, start=complex(.4, .9), epsilon=1.12e-16):
         -100.0
         >>> halley(p, -10)
         -3.0
+
+    The method converges slowly (or it does not converge at all) when there are multiple roots. With ``sqf=True``
+    the polynomial is decomposed first with :meth:`pypol.Polynomial.sqf_list`, and the roots of every factor (that
+    are simple) are found separately; the multiple roots are repeated::
+
+        >>> durand_kerner(from_roots([2, 2, 2, -1]), sqf=True)
+        ((-1+0j), (2+0j), (2+0j), (2+0j))
+
+    .. versionchanged:: 0.6
+        The *sqf* parameter
     '''
 
+    if sqf:
+        roots = ()
+        for factor, k in poly.sqf_list()[1]:
+            roots += tuple(r for r in durand_kerner(factor, start, epsilon) for _ in xrange(k))
+        return roots
+
     roots = []
     for e in xrange(poly.degree):
         roots.append(start ** e)
     while True:
         new = []
         for i, r in enumerate(roots):
-            new_r = r - (poly(r)) / (reduce(operator.mul, [(r - r_1) for j, r_1 in enumerate(roots) if i != j]))
+            new_r = r - (poly(r)) / (reduce(operator.mul, [(r - r_1) for j, r_1 in enumerate(roots) if i != j], 1))
             new.append(new_r)
         if all(str(n) == str(roots[i]) or abs(n - roots[i]) < epsilon for i, n in enumerate(new)):
             return tuple(new)
@@ -1054,4 +1128,8 @@ def lambert(poly, start, epsilon=float('-inf')):
         x_n = start - _hg(start)
         if x_n == start or abs(x_n - start) < epsilon:
             return x_n
-        start = x_n
\ No newline at end of file
+        start = x_n
+
+## The root-finding functions, which take the polynomial as their first argument (used by pypol.server and pypol.cli)
+_METHODS = ('ruffini', 'rational_roots', 'quadratic', 'cubic', 'quartic', 'newton', 'halley', 'householder', 'schroeder',
+            'laguerre', 'muller', 'ridder', 'durand_kerner', 'brent', 'bisection', 'lambert')
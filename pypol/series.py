@@ -31,7 +31,8 @@ Copyright (C) 2010-2011 Michele Lacchia
 
 import fractions
 
-from pypol import poly1d, polynomial, monomial, NULL, ONE, TWO, x
+from pypol import Polynomial, poly1d, polynomial, monomial, NULL, ONE, TWO, x
+from pypol.core import _dense_mul, _from_dense, _bit_length
 from pypol.funcs import polyder, bin_coeff, stirling2, harmonic, harmonic_g
 
 
@@ -142,6 +143,387 @@ _fermat_lucas = LucasSeq(3*x, -TWO, 'w')
 _chebyshev_t = LucasSeq(2*x, -ONE, 'w')
 _chebyshev_u = LucasSeq(2*x, -ONE)
 
+
+def _series_mul(a, b, n):
+    '''
+    Product of the coefficient lists *a* and *b*, truncated to *n* terms.
+    '''
+
+    a, b = a[:n], b[:n]
+    if not a or not b:
+        return []
+    if min(len(a), len(b)) < 16:
+        r = [0] * min(n, len(a) + len(b) - 1)
+        for i, c in enumerate(a):
+            if not c:
+                continue
+            for j, d in enumerate(b[:n - i]):
+                r[i + j] += c * d
+        return r
+    return _dense_mul(a, b)[:n]
+
+def _div(a, b):
+    if isinstance(a, (int, long)) and isinstance(b, (int, long)):
+        return fractions.Fraction(a, b)
+    return a / b
+
+def _series_inverse(f, n):
+    g = [_div(1, f[0])]
+    prec = 1
+    while prec < n:
+        prec = min(2 * prec, n)
+        e = [-c for c in _series_mul(f, g, prec)]
+        e[0] += 2
+        g = _series_mul(g, e, prec)
+    return g
+
+def _series_log(f, n):
+    d = [i * c for i, c in enumerate(f[1:n], 1)]
+    q = _series_mul(d, _series_inverse(f, n), n - 1)
+    return [0] + [_div(c, i) for i, c in enumerate(q, 1)]
+
+
+class PowerSeries(object):
+    '''
+    A truncated power series in one variable: :math:`a_0 + a_1x + \cdots + a_{n - 1}x^{n - 1} + O(x^n)`.
+
+    :param coeffs: the coefficients, from the lowest degree to the highest, a univariate :class:`pypol.Polynomial` or a number
+    :param integer order: the precision *n* of the series; by default it is the number of coefficients
+    :param string letter: the letter of the series
+    :raises: :exc:`ValueError` if *coeffs* is a polynomial that contains other letters
+
+    All the operations discard the terms of degree *n* or greater while they compute, so that a product costs
+    at most :math:`O(n^2)` and it is never worth computing the full product of two polynomials.
+    The order of a result is the lowest order of the operands.
+    Exact coefficients stay exact: divisions between integers give :class:`fractions.Fraction` objects.
+
+    For example, the Bernoulli numbers are the coefficients of the exponential generating function
+    :math:`\\frac{x}{e^x - 1}`::
+
+        >>> from math import factorial
+        >>> from pypol.series import PowerSeries
+        >>> e = PowerSeries([0, 1], 12).exp()
+        >>> e
+        + 1/39916800x^11 + 1/3628800x^10 + 1/362880x^9 + 1/40320x^8 + 1/5040x^7 + 1/720x^6 + 1/120x^5 + 1/24x^4 + 1/6x^3 + 1/2x^2 + x + 1 + O(x^12)
+        >>> g = PowerSeries(e[1:]).inverse() ## x / (e^x - 1)
+        >>> [g[k] * factorial(k) for k in xrange(8)]
+        [Fraction(1, 1), Fraction(-1, 2), Fraction(1, 6), Fraction(0, 1), Fraction(-1, 30), Fraction(0, 1), Fraction(1, 42), Fraction(0, 1)]
+
+    Series support the arithmetic operators, with numbers, polynomials and other series::
+
+        >>> s = PowerSeries([1, 1], 6)
+        >>> s
+        + x + 1 + O(x^6)
+        >>> 1 / s
+        - x^5 + x^4 - x^3 + x^2 - x + 1 + O(x^6)
+        >>> s ** fractions.Fraction(1, 2)
+        + 7/256x^5 - 5/128x^4 + 1/16x^3 - 1/8x^2 + 1/2x + 1 + O(x^6)
+
+    .. versionadded:: 0.6
+    '''
+
+    def __init__(self, coeffs, order=None, letter='x'):
+        if isinstance(coeffs, Polynomial):
+            if any(l != letter for l in coeffs.letters):
+                raise ValueError('the polynomial should contain only the letter %s' % letter)
+            coeffs = coeffs._dense(letter)
+        elif not isinstance(coeffs, (list, tuple)):
+            coeffs = [coeffs]
+        if order is None:
+            order = len(coeffs)
+        if order < 0:
+            raise ValueError('the order of a series cannot be negative')
+        self._coeffs = list(coeffs[:order]) + [0] * (order - len(coeffs))
+        self.order, self.letter = order, letter
+
+    @ property
+    def coefficients(self):
+        '''
+        The list of the coefficients, from :math:`a_0` to :math:`a_{n - 1}`.
+        '''
+
+        return list(self._coeffs)
+
+    def to_poly(self):
+        '''
+        Returns the series, without the :math:`O(x^n)` term, as a :class:`pypol.Polynomial`::
+
+            >>> PowerSeries([1, 2, 3], 5).to_poly()
+            + 3x^2 + 2x + 1
+        '''
+
+        return _from_dense(self._coeffs, self.letter)
+
+    def truncate(self, order):
+        '''
+        Returns the series with a lower precision *order*::
+
+            >>> PowerSeries([1, 2, 3, 4]).truncate(2)
+            + 2x + 1 + O(x^2)
+        '''
+
+        return PowerSeries(self._coeffs, min(order, self.order), self.letter)
+
+    def inverse(self):
+        '''
+        Returns the multiplicative inverse of the series, computed with Newton's iteration
+        :math:`g \\leftarrow g(2 - fg)`, which doubles the number of correct coefficients at every step::
+
+            >>> PowerSeries([1, -1], 6).inverse()
+            + x^5 + x^4 + x^3 + x^2 + x + 1 + O(x^6)
+
+        :raises: :exc:`ZeroDivisionError` if the constant term is 0
+        '''
+
+        if self.order and not self._coeffs[0]:
+            raise ZeroDivisionError('the constant term of the series is 0')
+        if not self.order:
+            return self._new([], 0)
+        return self._new(_series_inverse(self._coeffs, self.order))
+
+    def compose(self, other):
+        '''
+        Returns the series :math:`f(g(x))`, where *f* is this series and *g* is *other*, which must not have a
+        constant term::
+
+            >>> PowerSeries([1, 1, 1, 1], 4).compose(PowerSeries([0, 2], 4))
+            + 8x^3 + 4x^2 + 2x + 1 + O(x^4)
+
+        :raises: :exc:`ValueError` if the constant term of *other* is not 0
+        '''
+
+        other = self._coerce(other)
+        n = min(self.order, other.order)
+        g = other._coeffs[:n]
+        if g and g[0]:
+            raise ValueError('the series to substitute cannot have a constant term')
+        r = []
+        for c in reversed(self._coeffs[:n]):
+            r = _series_mul(r, g, n)
+            if r:
+                r[0] += c
+            else:
+                r = [c]
+        return self._new(r, n)
+
+    def derivative(self):
+        '''
+        Returns the derivative of the series, which has one term less::
+
+            >>> PowerSeries([1, 1, 1, 1]).derivative()
+            + 3x^2 + 2x + 1 + O(x^3)
+        '''
+
+        return self._new([i * c for i, c in enumerate(self._coeffs[1:], 1)], max(self.order - 1, 0))
+
+    def integral(self):
+        '''
+        Returns the integral of the series with a null constant term, which has one term more::
+
+            >>> PowerSeries([1, 2, 3]).integral()
+            + x^3 + x^2 + x + O(x^4)
+        '''
+
+        return self._new([0] + [_div(c, i) for i, c in enumerate(self._coeffs, 1)], self.order + 1)
+
+    def log(self):
+        '''
+        Returns the logarithm of the series, computed as :math:`\\int \\frac{f\\prime}{f}`::
+
+            >>> PowerSeries([1, 1], 5).log()
+            - 1/4x^4 + 1/3x^3 - 1/2x^2 + x + O(x^5)
+
+        :raises: :exc:`ValueError` if the constant term is not 1
+        '''
+
+        if self.order and self._coeffs[0] != 1:
+            raise ValueError('the constant term of the series must be 1')
+        if not self.order:
+            return self._new([], 0)
+        return self._new(_series_log(self._coeffs, self.order))
+
+    def exp(self):
+        '''
+        Returns the exponential of the series, computed with Newton's iteration
+        :math:`g \\leftarrow g(1 + f - \\log g)`::
+
+            >>> PowerSeries([0, 1], 5).exp()
+            + 1/24x^4 + 1/6x^3 + 1/2x^2 + x + 1 + O(x^5)
+
+        :raises: :exc:`ValueError` if the constant term is not 0
+        '''
+
+        n = self.order
+        if n and self._coeffs[0]:
+            raise ValueError('the constant term of the series must be 0')
+        if not n:
+            return self._new([], 0)
+        g = [1]
+        prec = 1
+        while prec < n:
+            prec = min(2 * prec, n)
+            g = g + [0] * (prec - len(g))
+            e = [c - l for c, l in zip(self._coeffs[:prec], _series_log(g, prec))]
+            e[0] += 1
+            g = _series_mul(g, e, prec)
+        return self._new(g)
+
+    def sqrt(self):
+        '''
+        Returns the square root of the series, computed with Newton's iteration
+        :math:`g \\leftarrow \\frac{1}{2}(g + \\frac{f}{g})`::
+
+            >>> PowerSeries([4, 1], 4).sqrt()
+            + 1/512x^3 - 1/64x^2 + 1/4x + 2 + O(x^4)
+
+        :raises: :exc:`ValueError` if the constant term is not a square of a rational number
+        '''
+
+        n = self.order
+        if not n:
+            return self._new([], 0)
+        c = self._coeffs[0]
+        if not c:
+            raise ValueError('the constant term of the series cannot be 0')
+        g = [_sqrt(c)]
+        prec = 1
+        while prec < n:
+            prec = min(2 * prec, n)
+            q = _series_mul(self._coeffs, _series_inverse(g + [0] * (prec - len(g)), prec), prec)
+            g = g + [0] * (prec - len(g))
+            g = [_div(a + b, 2) for a, b in zip(g, q)]
+        return self._new(g)
+
+    def _new(self, coeffs, order=None):
+        if order is None:
+            order = self.order
+        return PowerSeries(coeffs, order, self.letter)
+
+    def _coerce(self, other):
+        if isinstance(other, PowerSeries):
+            if other.letter != self.letter:
+                raise ValueError('the series have different letters')
+            return other
+        if isinstance(other, Polynomial):
+            return PowerSeries(other, self.order, self.letter)
+        return PowerSeries([other], self.order, self.letter)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return self._coeffs[k]
+        if k < 0:
+            raise IndexError('negative index')
+        if k >= self.order:
+            raise IndexError('the coefficient of x^%d is beyond the order of the series' % k)
+        return self._coeffs[k]
+
+    def __len__(self):
+        return self.order
+
+    def __eq__(self, other):
+        if not isinstance(other, PowerSeries):
+            return NotImplemented
+        return self.order == other.order and self.letter == other.letter and self._coeffs == other._coeffs
+
+    def __ne__(self, other):
+        r = self.__eq__(other)
+        if r is NotImplemented:
+            return r
+        return not r
+
+    def __neg__(self):
+        return self._new([-c for c in self._coeffs])
+
+    def __pos__(self):
+        return self
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        n = min(self.order, other.order)
+        return self._new([a + b for a, b in zip(self._coeffs[:n], other._coeffs[:n])], n)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + (-self._coerce(other))
+
+    def __rsub__(self, other):
+        return self._coerce(other) - self
+
+    def __mul__(self, other):
+        if not isinstance(other, (PowerSeries, Polynomial)):
+            return self._new([c * other for c in self._coeffs])
+        other = self._coerce(other)
+        n = min(self.order, other.order)
+        return self._new(_series_mul(self._coeffs, other._coeffs, n), n)
+
+    __rmul__ = __mul__
+
+    def __div__(self, other):
+        if not isinstance(other, (PowerSeries, Polynomial)):
+            return self._new([_div(c, other) for c in self._coeffs])
+        return self * self._coerce(other).inverse()
+
+    __truediv__ = __div__
+
+    def __rdiv__(self, other):
+        return self._coerce(other) * self.inverse()
+
+    __rtruediv__ = __rdiv__
+
+    def __pow__(self, exp):
+        '''
+        Raises the series to the power *exp*. Non-negative integers are computed by repeated squaring, negative
+        integers through :meth:`inverse`; for other exponents the constant term must be 1 and the power is
+        computed as :math:`\\exp(e\\log f)`.
+        '''
+
+        if isinstance(exp, (int, long)):
+            if exp < 0:
+                return self.inverse() ** -exp
+            r, b = [1], self._coeffs
+            while exp:
+                if exp & 1:
+                    r = _series_mul(r, b, self.order)
+                exp >>= 1
+                if exp:
+                    b = _series_mul(b, b, self.order)
+            return self._new(r)
+        return (self.log() * exp).exp()
+
+    def __repr__(self):
+        if self.order == 1:
+            o = 'O(%s)' % self.letter
+        else:
+            o = 'O(%s^%d)' % (self.letter, self.order)
+        if not self.order:
+            return 'O(1)'
+        return '%s + %s' % (repr(self.to_poly()), o)
+
+def _sqrt(c):
+    if isinstance(c, (int, long, fractions.Fraction)):
+        c = fractions.Fraction(c)
+        n, d = _isqrt(c.numerator), _isqrt(c.denominator)
+        if n is None or d is None:
+            raise ValueError('the constant term of the series is not the square of a rational number')
+        return fractions.Fraction(n, d)
+    return c ** .5
+
+def _isqrt(n):
+    if n < 0:
+        return None
+    r = n
+    if n > 1:
+        r = 1 << ((_bit_length(n) + 1) // 2)
+        while True:
+            y = (r + n // r) // 2
+            if y >= r:
+                break
+            r = y
+    if r * r == n:
+        return r
+    return None
+
 def fibonacci(n):
     '''
     Returns the *n-th* Fibonacci polynomial.
@@ -1216,13 +1598,16 @@ def bernoulli(m):
     `Wikipedia <http://en.wikipedia.org/wiki/Bernoulli_polynomials>`_ | `MathWorld <http://mathworld.wolfram.com/BernoulliPolynomial.html>`_
     '''
 
-    def _sum(n):
-        return sum((-1) ** k * bin_coeff(n, k) * (x + k) ** m for k in xrange(0, n + 1))
     if m < 0:
         raise ValueError('Bernoulli polynomials only defined for m >= 0')
     if m == 0:
         return ONE
-    return x ** m + sum(fractions.Fraction(1, n + 1) * _sum(n) for n in xrange(1, m + 1))
+    weights = [0] * (m + 1) ## The coefficient of (x + k)^m in the sum
+    for n in xrange(1, m + 1):
+        for k in xrange(n + 1):
+            weights[k] += fractions.Fraction((-1) ** k * bin_coeff(n, k), n + 1)
+    p = x ** m
+    return p + sum(w * p.shift(k) for k, w in enumerate(weights) if w)
 
 def bern_num(m):
     '''
@@ -1260,8 +1645,6 @@ def bern_num(m):
     `Wikipedia <http://en.wikipedia.org/wiki/Bernoulli_numbers>`_ | `MathWorld <http://mathworld.wolfram.com/BernoulliNumber.html>`_
     '''
 
-    def _sum(k):
-        return sum((-1) ** v * fractions.Fraction.from_float(bin_coeff(k, v)) * fractions.Fraction(v ** m, k + 1) for v in xrange(k + 1))
     if m < 0:
         raise ValueError('Bernoulli numbers only defined for m >= 0')
     if m == 0:
@@ -1270,8 +1653,12 @@ def bern_num(m):
         return fractions.Fraction(-1, 2)
     if m & 1:
         return 0
-    #return bernoulli(n).right_hand_side
-    return sum(_sum(k) for k in xrange(m + 1))
+    ## x / (e^x - 1) is the exponential generating function of the Bernoulli numbers
+    f, k = [], 1
+    for i in xrange(1, m + 2):
+        k *= i
+        f.append(fractions.Fraction(1, k))
+    return PowerSeries(f).inverse()[m] * (k // (m + 1))
 
 def b2(m):
     def b_c(j):
@@ -1335,13 +1722,16 @@ def euler(m):
     `MathWorld <http://mathworld.wolfram.com/EulerPolynomial.html>`_
     '''
 
-    def _sum(n):
-        return sum((- 1) ** k * bin_coeff(n, k) * (x + k) ** m for k in xrange(n + 1))
     if m < 0:
         raise ValueError('Euler polynomials only defined for m >= 0')
     if m == 0:
         return ONE
-    return x ** m + sum(fractions.Fraction(1, 2 ** n) * _sum(n) for n in xrange(1, m + 1))
+    weights = [0] * (m + 1) ## The coefficient of (x + k)^m in the sum
+    for n in xrange(1, m + 1):
+        for k in xrange(n + 1):
+            weights[k] += fractions.Fraction((-1) ** k * bin_coeff(n, k), 2 ** n)
+    p = x ** m
+    return p + sum(w * p.shift(k) for k, w in enumerate(weights) if w)
 
 def euler_num(m):
     '''
@@ -0,0 +1,616 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+Author: Michele Lacchia <michelelacchia@gmail.com>
+Copyright: 2010-2011 Michele Lacchia
+License: GNU GPL
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+
+This module implements a local server that evaluates polynomials and finds their roots, and its client
+
+Copyright (C) 2010-2011 Michele Lacchia
+'''
+
+import os
+import sys
+import Queue
+import socket
+import struct
+import fractions
+import optparse
+import threading
+import SocketServer
+import multiprocessing
+
+from pypol import roots
+from pypol.core import Polynomial, _write_varint, _read_varint, _write_number, _read_number
+from pypol.store import PolynomialStore
+
+__all__ = ['ServerError', 'PolynomialServer', 'UnixPolynomialServer', 'make_server', 'Client', 'Pipeline']
+
+## Every message is a frame: the length of the payload (4 bytes, big-endian) followed by the payload.
+##     request:  id | operation (1 byte) | arguments
+##     response: id | status (1 byte) | number of results | results   -- or the error message
+## The ids, the counts and the lengths are varints, the numbers are encoded as in Polynomial.to_bytes, the strings
+## are prefixed by their length. A polynomial is referenced by its key in the store of the server (_NAMED), or it is
+## sent along with the request, encoded by Polynomial.to_bytes (_INLINE).
+_FRAME = struct.Struct('>I')
+_MAX_FRAME = 2 ** 28
+_PING, _EVAL, _ROOTS = range(3)
+_OK, _ERROR = range(2)
+_NAMED, _INLINE = range(2)
+
+DEFAULT_PORT = 7345
+## The evaluators kept by every worker; when there are too many, the cache is emptied
+_CACHE_SIZE = 1024
+
+
+class ServerError(Exception):
+    '''
+    Raised by the client when the server could not carry out a request. The message is the one of the exception
+    raised on the server, preceded by its type.
+
+    .. versionadded:: 0.6
+    '''
+
+
+def _send_frame(sock, payload):
+    sock.sendall(_FRAME.pack(len(payload)) + payload)
+
+def _recv_exactly(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return ''.join(chunks)
+
+def _recv_frame(sock):
+    '''
+    Returns the payload of the next frame, or None if the connection has been closed.
+    '''
+
+    header = _recv_exactly(sock, _FRAME.size)
+    if header is None:
+        return None
+    n = _FRAME.unpack(header)[0]
+    if n > _MAX_FRAME:
+        raise ValueError('frame too large: %d bytes' % n)
+    payload = _recv_exactly(sock, n)
+    if payload is None:
+        raise ValueError('connection closed in the middle of a frame')
+    return payload
+
+def _write_string(buf, s):
+    if isinstance(s, unicode):
+        s = s.encode('utf-8')
+    _write_varint(buf, len(s))
+    buf += s
+
+def _read_string(data, pos):
+    n, pos = _read_varint(data, pos)
+    return str(data[pos:pos + n]), pos + n
+
+def _write_poly(buf, poly):
+    if isinstance(poly, Polynomial):
+        buf.append(_INLINE)
+        _write_string(buf, poly.to_bytes())
+    else:
+        buf.append(_NAMED)
+        _write_string(buf, poly)
+
+
+## Worker processes
+_store = None
+_cache = {}
+
+def _init_worker(path):
+    global _store
+    if path is not None:
+        _store = PolynomialStore(path)
+
+def _entry(data, pos):
+    '''
+    Reads a reference to a polynomial, and returns the cached pair (polynomial, evaluator).
+    '''
+
+    kind = data[pos]
+    ref, pos = _read_string(data, pos + 1)
+    key = (kind, ref)
+    if key not in _cache:
+        if kind == _INLINE:
+            poly = Polynomial.from_bytes(ref)
+        elif _store is None:
+            raise KeyError('the server has no store: %r' % ref)
+        else:
+            poly = _store[ref]
+        if len(_cache) >= _CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = [poly, None]
+    return _cache[key], pos
+
+def _evaluate(data, pos):
+    entry, pos = _entry(data, pos)
+    poly, f = entry
+    if f is None:
+        f = entry[1] = poly.compile()
+    n, pos = _read_varint(data, pos)
+    arity, pos = _read_varint(data, pos)
+    m = len(f.letters)
+    if m and arity != m:
+        raise ValueError('expected points with %d values (%s), got %d' % (m, ', '.join(f.letters), arity))
+    values = []
+    for _ in xrange(n):
+        point = []
+        for _ in xrange(arity):
+            v, pos = _read_number(data, pos)
+            point.append(v)
+        values.append(f(*point[:m]))
+    return values
+
+def _find_roots(data, pos):
+    entry, pos = _entry(data, pos)
+    method, pos = _read_string(data, pos)
+    if method not in roots._METHODS:
+        raise ValueError('unknown root-finding method: %r' % method)
+    n, pos = _read_varint(data, pos)
+    kwargs = {}
+    for _ in xrange(n):
+        name, pos = _read_string(data, pos)
+        kwargs[name], pos = _read_number(data, pos)
+    result = getattr(roots, method)(entry[0], **kwargs)
+    if isinstance(result, (list, tuple)):
+        return list(result)
+    return [result]
+
+def _handle(payload):
+    '''
+    Runs in the workers: decodes a request and returns the encoded response. All the exceptions are reported to the
+    client.
+    '''
+
+    data = bytearray(payload)
+    id = 0
+    try:
+        id, pos = _read_varint(data, 0)
+        op = data[pos]
+        if op == _PING:
+            results = []
+        elif op == _EVAL:
+            results = _evaluate(data, pos + 1)
+        elif op == _ROOTS:
+            results = _find_roots(data, pos + 1)
+        else:
+            raise ValueError('unknown operation: %d' % op)
+        buf = bytearray()
+        _write_varint(buf, id)
+        buf.append(_OK)
+        _write_varint(buf, len(results))
+        for v in results:
+            if isinstance(v, fractions.Fraction) and v.denominator == 1:
+                v = v.numerator
+            _write_number(buf, v)
+    except Exception, e:
+        buf = bytearray()
+        _write_varint(buf, id)
+        buf.append(_ERROR)
+        _write_string(buf, '%s: %s' % (type(e).__name__, e))
+    return bytes(buf)
+
+
+class _Handler(SocketServer.BaseRequestHandler):
+    '''
+    Serves a connection: the requests are handed to the worker pool as soon as they are read, and the responses are
+    sent back in the same order by another thread, so a client can send many requests without waiting.
+    '''
+
+    def handle(self):
+        pending = Queue.Queue()
+        writer = threading.Thread(target=self._write, args=(pending,))
+        writer.start()
+        try:
+            while True:
+                try:
+                    payload = _recv_frame(self.request)
+                except (ValueError, socket.error):
+                    break
+                if payload is None:
+                    break
+                pending.put(self.server.pool.apply_async(_handle, (payload,)))
+        finally:
+            pending.put(None)
+            writer.join()
+
+    def _write(self, pending):
+        while True:
+            result = pending.get()
+            if result is None:
+                return
+            try:
+                _send_frame(self.request, result.get())
+            except socket.error: ## The client has gone, the other responses are discarded
+                pass
+
+
+class _PoolMixIn(SocketServer.ThreadingMixIn):
+    daemon_threads = True
+
+    def _start_pool(self, store, workers):
+        ## The pool is started before the socket is bound, so the workers do not inherit it
+        self.pool = multiprocessing.Pool(workers, _init_worker, (store,))
+
+    def _stop_pool(self):
+        self.pool.terminate()
+        self.pool.join()
+
+
+class PolynomialServer(_PoolMixIn, SocketServer.TCPServer):
+    '''
+    A server listening on a TCP *address* (a pair (host, port)), see :func:`make_server`.
+
+    .. versionadded:: 0.6
+    '''
+
+    allow_reuse_address = True
+
+    def __init__(self, address, store=None, workers=None):
+        self._start_pool(store, workers)
+        SocketServer.TCPServer.__init__(self, address, _Handler)
+
+    def server_close(self):
+        SocketServer.TCPServer.server_close(self)
+        self._stop_pool()
+
+
+class UnixPolynomialServer(_PoolMixIn, SocketServer.UnixStreamServer):
+    '''
+    A server listening on the Unix socket *address* (a path), see :func:`make_server`. The socket file is removed
+    when the server is closed.
+
+    .. versionadded:: 0.6
+    '''
+
+    def __init__(self, address, store=None, workers=None):
+        self._start_pool(store, workers)
+        SocketServer.UnixStreamServer.__init__(self, address, _Handler)
+
+    def server_close(self):
+        SocketServer.UnixStreamServer.server_close(self)
+        self._stop_pool()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def make_server(address, store=None, workers=None):
+    '''
+    Returns a server that evaluates polynomials and finds their roots for the :class:`Client` objects that connect to
+    *address*: a path for a Unix socket, or a pair (host, port). The requests are carried out by a pool of *workers*
+    processes (default to the number of CPUs); every worker keeps the polynomials it has already seen, together with
+    the functions generated by :meth:`pypol.Polynomial.compile` to evaluate them.
+
+    The polynomials are sent along with the requests, or they are read by key from the store at the path *store*
+    (see :mod:`pypol.store`)::
+
+        >>> from pypol.server import make_server
+        >>> server = make_server('/tmp/pypol.sock', store='chebyshev.pps')
+        >>> server.serve_forever()
+
+    The same is done from the command line with::
+
+        $ python -m pypol.server --unix /tmp/pypol.sock --store chebyshev.pps
+
+    .. versionadded:: 0.6
+    '''
+
+    if isinstance(address, basestring):
+        return UnixPolynomialServer(address, store, workers)
+    return PolynomialServer(address, store, workers)
+
+
+class Client(object):
+    '''
+    The client of a server made by :func:`make_server`, at *address* (a path, or a pair (host, port)). It opens at
+    most *size* connections, and reuses them; it can be shared between threads::
+
+        >>> from pypol.server import Client
+        >>> c = Client('/tmp/pypol.sock')
+        >>> c.eval('T4', [0, 1, 0.5])
+        [1, 1, -0.5]
+        >>> c.eval(polynomial('x^2y - 1/2'), [(1, 2), (3, 1)])
+        [Fraction(3, 2), Fraction(17, 2)]
+        >>> c.roots('T2', 'quadratic')
+        [0.7071067811865476, -0.7071067811865476]
+
+    A polynomial is given by its key in the store of the server, or as a :class:`pypol.Polynomial`, that is sent
+    with the request (the server keeps it for the next requests too). Many requests can be sent at once with a
+    :class:`Pipeline`.
+
+    :param timeout: the timeout of the sockets, in seconds (default None, no timeout)
+
+    .. versionadded:: 0.6
+    '''
+
+    def __init__(self, address, size=4, timeout=None):
+        self.address = address
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._cond = threading.Condition()
+        self._open = 0
+
+    def _connect(self):
+        family = socket.AF_UNIX if isinstance(self.address, basestring) else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.address)
+        except:
+            sock.close()
+            raise
+        return sock
+
+    def _acquire(self):
+        '''
+        Returns an idle connection, or opens a new one if there are less than *size*; otherwise waits for one of them
+        to be released.
+        '''
+
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            return self._connect()
+        except:
+            self._release(None)
+            raise
+
+    def _release(self, sock):
+        '''
+        Puts the connection back in the pool, or forgets it if it is None.
+        '''
+
+        with self._cond:
+            if sock is None:
+                self._open -= 1
+            else:
+                self._idle.append(sock)
+            self._cond.notify()
+
+    def _call(self, requests):
+        '''
+        Sends all the *requests* (operation and arguments, without the id) on a single connection, then reads the
+        responses. Returns the list of the results, with a :exc:`ServerError` in place of the failed ones.
+        '''
+
+        frames = []
+        for id, body in enumerate(requests):
+            buf = bytearray()
+            _write_varint(buf, id)
+            buf += body
+            frames.append(_FRAME.pack(len(buf)) + bytes(buf))
+        sock = self._acquire()
+        try:
+            sock.sendall(''.join(frames))
+            results = [None] * len(requests)
+            for _ in requests:
+                payload = _recv_frame(sock)
+                if payload is None:
+                    raise socket.error('connection closed by the server')
+                data = bytearray(payload)
+                id, pos = _read_varint(data, 0)
+                status = data[pos]
+                if status == _OK:
+                    n, pos = _read_varint(data, pos + 1)
+                    values = []
+                    for _ in xrange(n):
+                        v, pos = _read_number(data, pos)
+                        values.append(v)
+                    results[id] = values
+                else:
+                    results[id] = ServerError(_read_string(data, pos + 1)[0])
+        except:
+            sock.close()
+            self._release(None)
+            raise
+        self._release(sock)
+        return results
+
+    def _call_one(self, body):
+        result = self._call([body])[0]
+        if isinstance(result, ServerError):
+            raise result
+        return result
+
+    def ping(self):
+        '''
+        Returns True if the server answers.
+        '''
+
+        self._call_one(_ping_request())
+        return True
+
+    def eval(self, poly, points):
+        '''
+        Returns the values of the polynomial *poly* at all the *points*: numbers for univariate polynomials, otherwise
+        tuples with the values of the :attr:`~pypol.Polynomial.letters` of the polynomial, in that order. The
+        arithmetic is exact.
+
+        :raises: :exc:`ServerError` if the polynomial does not exist, or the points are wrong
+        '''
+
+        return self._call_one(_eval_request(poly, points))
+
+    def roots(self, poly, method='durand_kerner', **kwargs):
+        '''
+        Returns the list of the roots of *poly* found with *method*, the name of a function of :mod:`pypol.roots`;
+        the keyword arguments (numbers) are passed to it. If the method finds a single root, the list has one item.
+
+        :raises: :exc:`ServerError` if the polynomial does not exist, or the method fails
+        '''
+
+        return self._call_one(_roots_request(poly, method, kwargs))
+
+    def pipeline(self):
+        '''
+        Returns a new :class:`Pipeline`.
+        '''
+
+        return Pipeline(self)
+
+    def close(self):
+        '''
+        Closes the idle connections.
+        '''
+
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for sock in idle:
+            sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Pipeline(object):
+    '''
+    Collects many requests and sends them at once on a single connection of *client*, without waiting for the
+    responses in between::
+
+        >>> p = c.pipeline()
+        >>> for n in xrange(10):
+        ...     p.eval('T%d' % n, [0.5])
+        ...
+        >>> p.roots('T2', 'quadratic')
+        >>> p.eval('T100', [0.5])
+        >>> p.execute()
+        [[1], [0.5], [-0.5], [-1.0], [-0.5], [0.5], [1.0], [0.5], [-0.5], [-1.0], [0.7071067811865476, -0.7071067811865476], ServerError("KeyError: 'T100'",)]
+
+    .. versionadded:: 0.6
+    '''
+
+    def __init__(self, client):
+        self._client = client
+        self._requests = []
+
+    def __len__(self):
+        return len(self._requests)
+
+    def ping(self):
+        '''
+        Like :meth:`Client.ping`, the result is an empty list.
+        '''
+
+        self._requests.append(_ping_request())
+
+    def eval(self, poly, points):
+        '''
+        Like :meth:`Client.eval`.
+        '''
+
+        self._requests.append(_eval_request(poly, points))
+
+    def roots(self, poly, method='durand_kerner', **kwargs):
+        '''
+        Like :meth:`Client.roots`.
+        '''
+
+        self._requests.append(_roots_request(poly, method, kwargs))
+
+    def execute(self):
+        '''
+        Sends the requests, and returns the list of the results in the same order. The requests that failed are
+        not raised: their results are :exc:`ServerError` instances. The pipeline is emptied.
+        '''
+
+        requests, self._requests = self._requests, []
+        if not requests:
+            return []
+        return self._client._call(requests)
+
+
+def _ping_request():
+    return bytearray([_PING])
+
+def _eval_request(poly, points):
+    points = list(points)
+    buf = bytearray([_EVAL])
+    _write_poly(buf, poly)
+    _write_varint(buf, len(points))
+    if points and isinstance(points[0], (tuple, list)):
+        arity = len(points[0])
+    else:
+        arity = 1
+        points = [(p,) for p in points]
+    _write_varint(buf, arity)
+    for point in points:
+        if len(point) != arity:
+            raise ValueError('all the points must have %d values' % arity)
+        for v in point:
+            _write_number(buf, v)
+    return buf
+
+def _roots_request(poly, method, kwargs):
+    buf = bytearray([_ROOTS])
+    _write_poly(buf, poly)
+    _write_string(buf, method)
+    _write_varint(buf, len(kwargs))
+    for name, v in kwargs.iteritems():
+        _write_string(buf, name)
+        _write_number(buf, v)
+    return buf
+
+
+def main(args=None):
+    parser = optparse.OptionParser(usage='python -m pypol.server [options]',
+                                   description='Serves polynomial evaluation and root finding to pypol.server.Client')
+    parser.add_option('--unix', metavar='PATH', help='listen on the Unix socket PATH')
+    parser.add_option('--host', default='localhost', help='listen on HOST (default %default)')
+    parser.add_option('--port', type='int', default=DEFAULT_PORT, help='listen on PORT (default %default)')
+    parser.add_option('--store', metavar='PATH', help='serve the polynomials of the store at PATH')
+    parser.add_option('--workers', type='int', help='number of worker processes (default to the number of CPUs)')
+    options, args = parser.parse_args(args)
+    if args:
+        parser.error('unexpected arguments: %s' % ' '.join(args))
+
+    address = options.unix or (options.host, options.port)
+    server = make_server(address, options.store, options.workers)
+    sys.stderr.write('pypol.server: listening on %s\n' % (address,))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    ## The workers must find the functions in pypol.server, not in __main__
+    from pypol.server import main
+    main()
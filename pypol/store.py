@@ -0,0 +1,258 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+Author: Michele Lacchia <michelelacchia@gmail.com>
+Copyright: 2010-2011 Michele Lacchia
+License: GNU GPL
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+
+This module implements an on-disk container for large collections of polynomials, read lazily through mmap
+
+Copyright (C) 2010-2011 Michele Lacchia
+'''
+
+import mmap
+import struct
+
+from core import Polynomial
+
+__all__ = ['StoreWriter', 'PolynomialStore', 'dump']
+
+## File layout:
+##     MAGIC | records | keys | index | trailer
+## every record is the output of Polynomial.to_bytes(), the index is an array
+## of fixed-size entries sorted by key, so that a key can be found with a
+## binary search directly on the mapped file, without reading the index first.
+MAGIC = 'PYPOLST1'
+_ENTRY = struct.Struct('<QIQI') # key offset, key length, record offset, record length
+_TRAILER = struct.Struct('<QQ8s') # index offset, number of entries, MAGIC
+
+def _key(key):
+    if isinstance(key, unicode):
+        return key.encode('utf-8')
+    return str(key)
+
+
+class StoreWriter(object):
+    '''
+    Writes a polynomial store in the file *path*. The polynomials are appended to the file as soon as they are
+    added, the index is written by :meth:`close`::
+
+        >>> from pypol.series import chebyshev_t
+        >>> from pypol.store import StoreWriter, PolynomialStore
+        >>> with StoreWriter('chebyshev.pps') as w:
+        ...     for n in xrange(1000):
+        ...         w.add('T%d' % n, chebyshev_t(n))
+        ...
+        >>> s = PolynomialStore('chebyshev.pps')
+        >>> len(s)
+        1000
+        >>> s['T4']
+        + 8x^4 - 8x^2 + 1
+
+    :raises: :exc:`ValueError` if a key is added twice
+
+    .. versionadded:: 0.6
+    '''
+
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._entries = {}
+
+    def add(self, key, poly):
+        '''
+        Appends the polynomial *poly* to the store, under the key *key* (a string).
+        '''
+
+        key = _key(key)
+        if key in self._entries:
+            raise ValueError('duplicate key: %r' % key)
+        data = poly.to_bytes()
+        self._file.write(data)
+        self._entries[key] = (self._offset, len(data))
+        self._offset += len(data)
+
+    def close(self):
+        '''
+        Writes the index and closes the file. The store cannot be read before it has been closed.
+        '''
+
+        if self._file.closed:
+            return
+        keys = sorted(self._entries)
+        key_offsets = []
+        for key in keys:
+            key_offsets.append(self._offset)
+            self._file.write(key)
+            self._offset += len(key)
+
+        index_offset = self._offset
+        for key, key_offset in zip(keys, key_offsets):
+            self._file.write(_ENTRY.pack(key_offset, len(key), *self._entries[key]))
+        self._file.write(_TRAILER.pack(index_offset, len(keys), MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PolynomialStore(object):
+    '''
+    A read-only store of polynomials, written by :class:`StoreWriter` or :func:`dump`.
+
+    The file is mapped in memory with :mod:`mmap`, and nothing is read when it is opened, apart from the trailer:
+    the keys are looked up with a binary search on the index, and only the records of the polynomials that are
+    actually accessed are decoded (so only their pages are read from disk).
+    It behaves like a read-only dictionary::
+
+        >>> s = PolynomialStore('chebyshev.pps')
+        >>> 'T42' in s
+        True
+        >>> s['T2']
+        + 2x^2 - 1
+        >>> s.get('T1000') is None
+        True
+        >>> list(s)[:3]
+        ['T0', 'T1', 'T10']
+
+    :raises: :exc:`ValueError` if *path* is not a polynomial store
+
+    .. versionadded:: 0.6
+    '''
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, mmap.error): ## An empty file cannot be mapped
+            self._file.close()
+            raise ValueError('%s is not a polynomial store' % path)
+        size = len(self._map)
+        if size < len(MAGIC) + _TRAILER.size or self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('%s is not a polynomial store' % path)
+        self._index, self._len, magic = _TRAILER.unpack_from(self._map, size - _TRAILER.size)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError('%s is not a polynomial store (it has not been closed?)' % path)
+
+    def _entry(self, i):
+        return _ENTRY.unpack_from(self._map, self._index + i * _ENTRY.size)
+
+    def _key_at(self, i):
+        key_offset, key_length = self._entry(i)[:2]
+        return self._map[key_offset:key_offset + key_length]
+
+    def _find(self, key):
+        key = _key(key)
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._len:
+            entry = self._entry(lo)
+            if self._map[entry[0]:entry[0] + entry[1]] == key:
+                return entry[2:]
+        raise KeyError(key)
+
+    def view(self, key):
+        '''
+        Returns a read-only view of the record of *key*, without copying it.
+        The view can be passed to :meth:`pypol.Polynomial.from_bytes`, or written somewhere else as it is.
+        '''
+
+        offset, length = self._find(key)
+        return buffer(self._map, offset, length)
+
+    def get(self, key, default=None):
+        '''
+        Returns the polynomial stored under *key*, or *default* if there is no such key.
+        '''
+
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        '''
+        Returns a list of all the keys, sorted.
+        '''
+
+        return list(self)
+
+    def close(self):
+        '''
+        Closes the store, unmapping the file.
+        '''
+
+        self._map.close()
+        self._file.close()
+
+    def __getitem__(self, key):
+        return Polynomial.from_bytes(self.view(key))
+
+    def __contains__(self, key):
+        try:
+            self._find(key)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for i in xrange(self._len):
+            yield self._key_at(i)
+
+    def __len__(self):
+        return self._len
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def dump(path, items):
+    '''
+    Writes all the polynomials in *items* into a new store. *items* can be a dictionary or an iterable of
+    ``(key, polynomial)`` pairs, which is consumed lazily::
+
+        >>> from pypol.funcs import random_poly
+        >>> dump('random.pps', (('r%d' % i, random_poly()) for i in xrange(100000)))
+        >>> len(PolynomialStore('random.pps'))
+        100000
+
+    .. versionadded:: 0.6
+    '''
+
+    if hasattr(items, 'iteritems'):
+        items = items.iteritems()
+    with StoreWriter(path) as w:
+        for key, poly in items:
+            w.add(key, poly)
@@ -23,6 +23,7 @@ setup(name='pypol_',
       packages=find_packages(),
       include_package_data=True,
       cmdclass={'test': PyTest},
+      entry_points={'console_scripts': ['pypol = pypol.cli:main']},
       platforms='any',
       classifiers=['Topic :: Scientific/Engineering :: Mathematics',
                    'Intended Audience :: Science/Research',
@@ -0,0 +1,84 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+'''
+
+import fractions
+
+import py
+import pypol
+import pypol.batch as batch
+from pypol.series import chebyshev_t
+from pypol.funcs import random_poly
+
+class TestBatch(object):
+    def setup_method(self, method):
+        self.polys = [chebyshev_t(n) for n in xrange(1, 13)]
+
+    def testMapOp(self):
+        expected = [p.derivative(2) for p in self.polys]
+        assert batch.map_op('derivative', self.polys, (2,), workers=1) == expected
+        assert batch.map_op('derivative', self.polys, (2,), chunksize=5, workers=2) == expected
+        x = pypol.x
+        assert batch.map_op(pypol.gcd, [(x**2 - 1, x**2 + 2*x + 1), (x**3, x**2)], workers=2) == [-2*x - 2, x**2]
+        assert batch.map_op('derivative', [], workers=2) == []
+
+    def testFailures(self):
+        items = [(p, pypol.NULL if i % 5 == 2 else pypol.x) for i, p in enumerate(self.polys)]
+        results = batch.map_op('__div__', items, chunksize=3, workers=2)
+        assert len(results) == len(items)
+        for i, r in enumerate(results):
+            if i % 5 == 2:
+                assert isinstance(r, batch.Failure)
+                assert (r.index, r.type) == (i, 'ZeroDivisionError')
+                assert 'Traceback' in r.traceback
+            else:
+                assert r == self.polys[i] / pypol.x
+
+    def testMapEval(self):
+        points = [0, 1, fractions.Fraction(1, 2)]
+        assert batch.map_eval(self.polys, points, workers=2) == [p.eval_points(points) for p in self.polys]
+        polys = [pypol.polynomial('xy - 1/2'), pypol.polynomial('x - y')]
+        assert batch.map_eval(polys, [(1, 2), (3, 4)], 'xy', workers=1) == [[fractions.Fraction(3, 2), fractions.Fraction(23, 2)], [-1, -1]]
+
+    def testMapRoots(self):
+        polys = [pypol.poly1d([1, 0, -4]), pypol.poly1d([1, -3, 2]), pypol.poly1d([1, 0, 1])]
+        assert batch.map_roots(polys, 'ruffini', workers=2) == [[-2, 2], [1, 2], []]
+        assert batch.map_roots(polys[:1], 'newton', start=1, workers=1) == [2]
+
+    def testMul(self):
+        p = random_poly(len_=60, letters='xyzw', max_letters=4, exp_range=xrange(-3, 8), not_null=True)
+        q = random_poly(len_=40, letters='xyz', max_letters=3, exp_range=xrange(6), not_null=True)
+        assert batch.mul(p, q, chunksize=7, workers=2) == p * q
+        assert batch.mul(q, p, workers=1) == p * q
+        assert batch.mul(p, pypol.NULL, workers=1) == pypol.NULL
+        assert batch.mul(pypol.monomial(3), pypol.monomial(4), workers=1) == pypol.monomial(12)
+        r = batch.mul(pypol.poly1d([1, 1]), pypol.poly1d([1, -1]), workers=2)
+        assert r == pypol.poly1d([1, 0, -1]) and r.representation == 'dense'
+
+    def testMulBigExponents(self):
+        p = pypol.monomial(x=10**20, y=3) + 1
+        assert batch.mul(p, p + pypol.x, chunksize=1, workers=2) == p * (p + pypol.x)
+
+if __name__ == '__main__':
+    import sys
+    import os.path
+    py.test.main(args=[os.path.abspath(__file__)] + sys.argv[1:])
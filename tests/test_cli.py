@@ -0,0 +1,87 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+'''
+
+import os
+import shutil
+import tempfile
+
+import py
+import pypol.cli as cli
+
+POLYS = '''# a comment
+x^2 - 3x + 2
+2x^3 - 4x^2 + 1
+
+x^2 + y^2 - 1/2
+'''
+
+class TestCli(object):
+    def setup_method(self, method):
+        self.dir = tempfile.mkdtemp()
+        self.input = os.path.join(self.dir, 'polys.txt')
+        self.output = os.path.join(self.dir, 'out.txt')
+        with open(self.input, 'w') as f:
+            f.write(POLYS)
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.dir)
+
+    def run(self, *args):
+        status = cli.main(list(args) + ['-o', self.output, self.input])
+        with open(self.output) as f:
+            return status, f.read().splitlines()
+
+    def testSimplify(self):
+        assert self.run() == (0, ['+ x^2 - 3x + 2', '+ 2x^3 - 4x^2 + 1', '+ x^2 + y^2 - 1/2'])
+        assert self.run('-d', 'simplify') == self.run()
+
+    def testDerive(self):
+        assert self.run('-d', 'derive', '-d', 'derive') == (0, ['+ 2', '+ 12x - 8', '+ 2'])
+        assert self.run('-d', 'derive --letter x --order 2') == (0, ['+ 2', '+ 12x - 8', '+ 2'])
+        assert self.run('-d', 'derive --letter y') == (0, ['0', '0', '+ 2y'])
+
+    def testRoots(self, capsys):
+        status, lines = self.run('-d', 'roots --method ruffini')
+        assert status == 1 and lines == ['1 2', '', '']
+        assert 'polys.txt:5: ValueError' in capsys.readouterr()[1]
+        status, lines = self.run('-d', 'roots --method newton --start 0.5 --epsilon 1e-12', '-w', '2', '-c', '1')
+        assert abs(float(lines[0]) - 1) < 1e-9 and abs(float(lines[1]) - 0.5969682832374696) < 1e-9
+
+    def testEval(self):
+        points = os.path.join(self.dir, 'points.txt')
+        with open(points, 'w') as f:
+            f.write('1, 2\n\n1/2 0\n')
+        assert self.run('-d', 'eval --at 0,0 --points %s --letters xy' % points, '-w', '2') == \
+               (0, ['2 0 3/4', '1 -1 1/4', '-1/2 9/2 -1/4'])
+        status, lines = self.run('-d', 'eval --at 2')
+        assert status == 1 and lines == ['0', '1', '']
+
+    def testErrors(self):
+        for args in (['-d', 'frobnicate'], ['-d', 'eval'], ['-d', 'roots', '-d', 'derive'],
+                     ['-d', 'derive --order']):
+            py.test.raises(SystemExit, cli.main, args + [self.input])
+
+if __name__ == '__main__':
+    import sys
+    import os.path
+    py.test.main(args=[os.path.abspath(__file__)] + sys.argv[1:])
@@ -22,6 +22,7 @@ Requirements:
 '''
 
 import fractions
+import operator
 
 import py
 import pypol
@@ -40,6 +41,24 @@ class TestFuncs(object):
         assert map(p, [1, -3, 44, 45245, -2332]) == [0, 0, 0, 0, 0]
         assert funcs.from_roots([1, -2, 3], 'o').letters == ('o',)
 
+    def testCompose(self):
+        p, q = pypol.poly1d([1, 0, -2]), pypol.poly1d([1, 1])
+        assert funcs.compose(p, q) == pypol.polynomial('x^2 + 2x - 1')
+        assert funcs.compose(pypol.polynomial('x^2 + y'), pypol.polynomial('2z'), 'y') == pypol.polynomial('x^2 + 2z')
+
+    def testResultant(self):
+        assert funcs.resultant(pypol.poly1d([1, 0, -2]), pypol.poly1d([1, -3])) == 7
+        assert funcs.resultant(pypol.poly1d([1, -3, 2]), pypol.poly1d([1, -1])) == 0
+        assert funcs.resultant(pypol.poly1d([1, -3]), pypol.poly1d([1, 0, -2])) == 7
+        assert funcs.resultant(pypol.poly1d([2, 1]), pypol.poly1d([3, 0, 1, 5])) == 33
+        assert funcs.resultant(pypol.polynomial('x^2 + y^2 - 4'), pypol.polynomial('x - y'), 'x') == \
+               pypol.polynomial('2y^2 - 4')
+        ## res(a, b) is the product of the values of b at the roots of a, when a is monic
+        a = funcs.from_roots(range(1, 41))
+        b = pypol.poly1d([(-1) ** k * (k * 7919 + 13) ** 3 for k in xrange(41)])
+        assert funcs.resultant(a, b) == reduce(operator.mul, (b(k) for k in xrange(1, 41)))
+        assert funcs.resultant(b, a) == funcs.resultant(a, b)
+
     def testRandomPoly(self):
         for _ in xrange(1000):
             assert type(funcs.random_poly()) == pypol.Polynomial
@@ -60,6 +79,13 @@ class TestFuncs(object):
         assert pypol.poly1d([3, 2, 1]) == funcs.polyder(p)
         assert pypol.poly1d([6, 2]) == funcs.polyder(p, 2)
         assert pypol.poly1d([6]) == funcs.polyder(p, 3)
+        assert funcs.polyder(pypol.polynomial('x^2y^3 + y'), letter='y') == pypol.polynomial('3x^2y^2 + 1')
+
+    def testGradient(self):
+        p = pypol.polynomial('x^2y^3 + y')
+        assert funcs.gradient(p) == [pypol.polynomial('2xy^3'), pypol.polynomial('3x^2y^2 + 1')]
+        assert funcs.hessian(p) == [[pypol.polynomial('2y^3'), pypol.polynomial('6xy^2')],
+                                    [pypol.polynomial('6xy^2'), pypol.polynomial('6x^2y')]]
 
     def testPolyint(self):
         p = pypol.poly1d([4, -3, 4, 1])
@@ -81,7 +107,19 @@ class TestFuncs(object):
             assert funcs.polyint_(ONE, r, r2) == r2 - r ## More generally: polyint_(p, r1, r2) with p integer = (r2 - r1) * p
 
     def testInterpolation(self):
-        pass
+        assert funcs.interpolate([1, 2, 3], [1, 4, 9]) == x ** 2
+        assert funcs.interpolate([1, 2, 3, 4], [1, 8, 27, 64]) == x ** 3
+        assert funcs.interpolate([1, 2, 3, 4], [1, 8, 27, 64], 'newton') == x ** 3
+        assert funcs.interpolate([fractions.Fraction(1, 2), 0.25], [1, 2]) == -4 * x + 3
+        x_v = range(-20, 20, 3)
+        y_v = [fractions.Fraction(v ** 3, 7) - 1 for v in x_v]
+        p = funcs.interpolate(x_v, y_v)
+        assert p == fractions.Fraction(1, 7) * x ** 3 - 1
+        assert p == funcs.interpolate_newton(x_v, y_v)
+        p = funcs.interpolate([3, -1, 4, 1, 5, 9, 2, 6], [2, 7, 1, 8, 2, 8, 1, 8])
+        assert p.eval_points([3, -1, 4, 1, 5, 9, 2, 6]) == [2, 7, 1, 8, 2, 8, 1, 8]
+        py.test.raises(ValueError, funcs.interpolate, [1, 2, 1], [1, 2, 3])
+        py.test.raises(ValueError, funcs.interpolate_newton, [1, 2, 1], [1, 2, 3])
 
     def testBinCoeff(self):
         py.test.raises(ValueError, lambda: funcs.bin_coeff(1, 2))
@@ -22,10 +22,13 @@ Requirements:
 '''
 
 import copy
+import fractions
+import pickle
 import operator
 
 import py
 import pypol
+import pypol.funcs
 
 class TestPolynomial(object):
     def setup_method(self, method):
@@ -139,6 +142,21 @@ class TestPolynomial(object):
         del self.b[-1]
         assert {'a': [3, 0], 'x': [3, 2, 0], 'b': [1]} == self.b.powers()
 
+    def testGet(self):
+        p = pypol.x**3 - pypol.y**3*pypol.x**4 - 2*pypol.z**5*pypol.y**5 + 7
+        assert [p.get(k) for k in xrange(6)] == [7, 0, 0, 1, -1, 0]
+        assert p.get(3, 'y') == -1
+        assert p.get(5, 'z') == -2
+        assert (pypol.x**1000 + 3*pypol.x**2).get(2) == 3
+
+    def testCoeffVector(self):
+        assert self.a.coeff_vector() == [-5, 1, -2, 1]
+        assert (pypol.x**5 - pypol.x).coeff_vector() == [0, -1, 0, 0, 0, 1]
+        assert (pypol.x**5 - pypol.x).coeff_vector('y') == [0]
+        assert pypol.monomial(3).coeff_vector() == [3]
+        p = pypol.x**300 + 2*pypol.x**7
+        assert p.coeff_vector() == [p.get(k) for k in xrange(301)]
+
     def testLinear(self):
         assert not self.a.islinear()
         assert self.c.islinear()
@@ -153,12 +171,252 @@ class TestPolynomial(object):
     def testComplete(self):
         assert self.c.iscomplete('x')
         assert not self.b.iscomplete('x')
+        p = pypol.polynomial('3x^3 + 2')
+        assert p._make_complete('x')
+        assert p.iscomplete('x')
+        assert p.monomials == ((3, {'x': 3}), (0, {'x': 2}), (0, {'x': 1}), (2, {}))
+        assert not p._make_complete('x')
+        py.test.raises(KeyError, p.iscomplete, 'q')
+
+    def testToDense(self):
+        p = pypol.polynomial('3x^4 - 2x + 1')
+        assert p.to_dense() == [3, 0, 0, -2, 1]
+        assert pypol.poly1d(p.to_dense()) == p
+        assert p.monomials == ((3, {'x': 4}), (-2, {'x': 1}), (1, {}))
+        assert pypol.polynomial('y^2 - 1').to_dense() == [1, 0, -1]
+        assert pypol.monomial(5).to_dense() == [5]
+        py.test.raises(ValueError, self.b.to_dense, 'x')
 
     def testFromRoots(self):
         p = pypol.Polynomial.from_roots([1, -3, 44, 45245, -2332])
         assert map(p, [1, -3, 44, 45245, -2332]) == [0, 0, 0, 0, 0]
         assert pypol.Polynomial.from_roots([1, -2, 3], 'o').letters == ('o',)
 
+    def testSubstitute(self):
+        p = pypol.polynomial('x^2 + xy - 3y')
+        assert p.substitute(x='y + 1') == pypol.polynomial('2y^2 + 1')
+        assert p.substitute(x=pypol.x + pypol.y, y=pypol.x - pypol.y) == pypol.polynomial('2x^2 + 2xy - 3x + 3y')
+        assert p.substitute(y=2) == pypol.polynomial('x^2 + 2x - 6')
+        assert p(x=pypol.y) == p.substitute(x='y') == p(y=pypol.y)(x=pypol.y)
+        assert p.substitute(z=3) == p
+        py.test.raises(ValueError, pypol.poly1d_2([[1, -1]]).substitute, x=pypol.y)
+
+    def testCompose(self):
+        p = pypol.poly1d(range(-20, 21))
+        q = pypol.poly1d(range(1, 31), 'y')
+        r = p.compose(q)
+        assert r.letters == ('y',)
+        assert r.degree == 1160
+        assert r(2) == p(q(2))
+        r = p.compose(pypol.poly1d([fractions.Fraction(1, 3), fractions.Fraction(5, 2)]))
+        assert r.substitute(x=3) == p.substitute(x=fractions.Fraction(7, 2))
+        assert self.a.compose(pypol.ONE * 2) == self.a(2)
+
+    def testEvalDerivs(self):
+        p = pypol.poly1d([2, -4, 0, 1])
+        assert p.eval_derivs(3) == [19, 30]
+        assert p.eval_derivs(3, 4) == [19, 30, 28, 12, 0]
+        q = pypol.poly1d(range(-10, 11))
+        a = -2
+        assert q.eval_derivs(a, 3) == [q.eval_points([a])[0]] + [pypol.funcs.polyder(q, k)(x=a) for k in (1, 2, 3)]
+        assert pypol.poly1d([fractions.Fraction(1, 2), 3, 0]).eval_derivs(fractions.Fraction(2, 3), 2) == [fractions.Fraction(20, 9), fractions.Fraction(11, 3), 1]
+        assert pypol.monomial(5).eval_derivs(2, 2) == [5, 0, 0]
+        py.test.raises(ValueError, pypol.polynomial('xy').eval_derivs, 1)
+
+    def testDerivative(self):
+        p = pypol.poly1d([2, -4, 0, 1])
+        assert p.derivative() == pypol.poly1d([6, -8, 0])
+        assert p.derivative(3) == pypol.monomial(12)
+        assert not p.derivative(4)
+        assert p.derivative(0) == p
+        assert pypol.polynomial('3x^2y + xy^3').derivative(letter='y') == pypol.polynomial('3x^2 + 3xy^2')
+        assert pypol.polynomial('3x^2y + xy^3').derivative(2, 'z') == pypol.Polynomial()
+        q = pypol.poly1d([1, 0, -7, 5])
+        assert q.antiderivative() == pypol.polynomial('1/4x^4 - 7/2x^2 + 5x')
+        assert q.antiderivative(3).derivative(3) == q
+        assert pypol.Polynomial(((1, {'x': -2}), (1, {'x': 1}))).derivative() == pypol.Polynomial(((-2, {'x': -3}), (1, {})))
+        py.test.raises(ValueError, p.derivative, -1)
+        py.test.raises(ValueError, p.antiderivative, -1)
+
+    def testDerivativeCache(self):
+        p = pypol.poly1d([2, -4, 0, 1])
+        assert p.derivative(2) == pypol.poly1d([12, -8])
+        assert (2, 'x') in p._derivs
+        p.append(pypol.polynomial('x^4'))
+        assert p._derivs is None
+        assert p.derivative(2) == pypol.poly1d([12, 12, -8])
+        d = p.derivative()
+        d.append(pypol.monomial(1))
+        assert p.derivative() == pypol.poly1d([4, 6, -8, 0])
+
+    def testGradient(self):
+        p = pypol.polynomial('x^3y - 2xy^2 + 5y')
+        assert p.gradient() == [pypol.polynomial('3x^2y - 2y^2'), pypol.polynomial('x^3 - 4xy + 5')]
+        assert p.gradient('yz') == [p.derivative(letter='y'), pypol.Polynomial()]
+        assert (1, 'x') in p._derivs
+        q = pypol.polynomial('x^2yz^3 + 1/2xz - y')
+        h = q.hessian('xyz')
+        assert h[0][2] == h[2][0] == pypol.polynomial('6xyz^2 + 1/2')
+        assert h[1][1] == pypol.Polynomial()
+        assert h[2][2] == q.derivative(2, 'z')
+        assert pypol.monomial(3).gradient() == []
+        assert pypol.poly1d([1, 2, 3]).hessian() == [[pypol.monomial(2)]]
+
+    def testEvalGradient(self):
+        p = pypol.polynomial('x^3y - 2xy^2 + 5y')
+        assert p.eval_gradient([(1, 2), (0, 0), (2, -1)]) == [[-2, -2], [0, 5], [-14, 21]]
+        q = pypol.polynomial('x^2yz^3 + 1/2xz - y')
+        assert q.eval_gradient([(1, 2, 3)], 'zyx') == [[fractions.Fraction(111, 2), 8, fractions.Fraction(25, 2)]]
+        assert pypol.poly1d([1, 2, 3]).eval_gradient([0, 1, 2]) == [[2], [4], [6]]
+        py.test.raises(ValueError, p.eval_gradient, [(1,)], 'x')
+
+    @ py.test.mark.skipif('__import__("pypol").core.numpy is None')
+    def testEvalGradientNumpy(self):
+        import numpy
+        p = pypol.polynomial('x^3y - 2xy^2 + 5y')
+        values = p.eval_gradient(numpy.array([(1, 2), (0, 0), (2, -1)]))
+        assert values.shape == (3, 2)
+        assert values.tolist() == [[-2, -2], [0, 5], [-14, 21]]
+
+    def testCompile(self):
+        p = pypol.polynomial('3x^4y - 2x^2y^3 + 1/2y + 7')
+        f = p.compile()
+        assert f.letters == ('x', 'y')
+        assert f(2, 3) == fractions.Fraction(-127, 2)
+        assert p.compile(scheme='estrin')(2, 3) == f(2, 3)
+        assert p.compile('yzx')(3, 0, 2) == f(2, 3)
+        assert 'return (3*y*x_2 - 2*y_3)*x_2 + Fraction(1, 2)*y + 7' in f.source
+        namespace = {}
+        exec f.source in namespace
+        assert namespace['polynomial'](-1, 5) == p.evaluator()(-1, 5)
+        q = pypol.poly1d([-1, 2, -3, 4, -5])
+        assert [q.compile(scheme='estrin')(k) for k in xrange(-3, 4)] == [q(k) for k in xrange(-3, 4)]
+        assert pypol.Polynomial().compile()() == 0
+        py.test.raises(ValueError, p.compile, 'x')
+        py.test.raises(ValueError, p.compile, scheme='ruffini')
+
+    def testCompileNegativeExponents(self):
+        p = pypol.Polynomial(((1, {'x': -2}), (2, {'x': 1})))
+        f = p.compile()
+        assert 'x_m2 = x**-2' in f.source
+        assert f(2) == 4.25
+        assert f(fractions.Fraction(1, 2)) == 5
+        assert p.compile(scheme='estrin')(2) == 4.25
+        q = pypol.Polynomial(((1, {'x': -2, 'y': -1}), (3, {'x': -1}), (2, {'y': 1})))
+        for scheme in ('horner', 'estrin'):
+            g = q.compile(scheme=scheme)
+            assert g(fractions.Fraction(2), 3) == q.evaluator()(fractions.Fraction(2), 3)
+
+    def testDiscriminant(self):
+        assert pypol.poly1d([1, -3, 2]).discriminant() == 1
+        assert pypol.poly1d([1, -2, 1]).discriminant() == 0
+        assert pypol.poly1d([1, 0, -1, 1]).discriminant() == -23
+        assert pypol.poly1d([2, 3]).discriminant() == 1
+        assert pypol.polynomial('ax^2 + bx + c').discriminant('x') == pypol.polynomial('b^2 - 4ac')
+        assert pypol.polynomial('ax^3 + bx^2 + cx + d').discriminant('x') == \
+               pypol.polynomial('b^2c^2 - 4ac^3 - 4b^3d - 27a^2d^2 + 18abcd')
+        p = pypol.Polynomial.from_roots([1, 2, 2, 5])
+        assert p.discriminant() == 0
+        assert (p + 1).discriminant() != 0
+        py.test.raises(ValueError, pypol.polynomial('3y').discriminant, 'x')
+
+    def testFactor(self):
+        x = pypol.x
+        assert pypol.poly1d([1, 0, 0, 0, -1]).factor() == (1, [(x - 1, 1), (x + 1, 1), (x**2 + 1, 1)])
+        assert (6 * (x - 1)**2 * (3*x + 2) * (x**2 - 2)).factor() == (6, [(x - 1, 2), (3*x + 2, 1), (x**2 - 2, 1)])
+        assert pypol.poly1d([1, 0, -10, 0, 1]).factor() == (1, [(pypol.poly1d([1, 0, -10, 0, 1]), 1)])
+        p = pypol.poly1d([1] + [0] * 23 + [-1])
+        c, factors = p.factor()
+        assert len(factors) == 8 ## The cyclotomic polynomials of the divisors of 24
+        assert reduce(operator.mul, [f ** k for f, k in factors], c) == p
+        q = pypol.poly1d([3, -7, 2, 9, -4, 1, 5]) * pypol.poly1d([2, 0, -11, 6, 1]) ** 2 * \
+            pypol.Polynomial.from_roots([10**9, -5])
+        c, factors = q.factor()
+        assert c == 1
+        assert [(f.degree, k) for f, k in factors] == [(1, 1), (1, 1), (4, 2), (6, 1)]
+        assert reduce(operator.mul, [f ** k for f, k in factors], c) == q
+
+    def testSqf(self):
+        p = pypol.Polynomial.from_roots([1, 2, 2, 3, 3, 3])
+        assert p.sqf_list() == (1, [(pypol.poly1d([1, -1]), 1), (pypol.poly1d([1, -2]), 2), (pypol.poly1d([1, -3]), 3)])
+        assert p.sqf() == pypol.Polynomial.from_roots([1, 2, 3])
+        q = 7 * (2*pypol.x - 3)**2 * (pypol.x**2 - 2)**3
+        c, factors = q.sqf_list()
+        assert (c, factors) == (7, [(2*pypol.x - 3, 2), (pypol.x**2 - 2, 3)])
+        assert q.sqf() == (2*pypol.x - 3) * (pypol.x**2 - 2)
+        assert pypol.poly1d([fractions.Fraction(1, 2), -1, fractions.Fraction(1, 2)]).sqf_list() == \
+               (fractions.Fraction(1, 2), [(pypol.poly1d([1, -1]), 2)])
+        assert pypol.monomial(5).sqf_list() == (5, [])
+        py.test.raises(ValueError, pypol.polynomial('x^2y').sqf_list)
+
+    def testShift(self):
+        p = pypol.poly1d([1, 0, -2])
+        assert p.shift(1) == pypol.polynomial('x^2 + 2x - 1')
+        assert p.shift(fractions.Fraction(-1, 2)) == pypol.polynomial('x^2 - x - 7/4')
+        assert p.shift(pypol.y) == p.substitute(x='x + y')
+        assert pypol.polynomial('x^2y + 3y').shift(-2, 'y') == pypol.polynomial('x^2y - 2x^2 + 3y - 6')
+        q = pypol.poly1d([fractions.Fraction(k, 3) for k in xrange(-40, 41)])
+        a = fractions.Fraction(-5, 7)
+        assert q.shift(a) == q.substitute(x=pypol.x + a)
+        assert all(type(c) in (int, long) for c in pypol.poly1d(range(100)).shift(3).coefficients)
+        py.test.raises(ValueError, pypol.poly1d_2([[1, -1]]).shift, 1)
+
+    def testEvalPoints(self):
+        p = pypol.polynomial('1/2x^3 - x + 1/3')
+        points = [0, 1, -2, fractions.Fraction(1, 2), fractions.Fraction(-7, 3)]
+        assert p.eval_points(points) == [p.substitute(x=v).rhs for v in points]
+        assert self.a.eval_points(range(-5, 5)) == map(self.a, range(-5, 5))
+        assert self.a.eval_points([0.5]) == [self.a(0.5)]
+        assert pypol.NULL.eval_points([1, 2]) == [0, 0]
+        py.test.raises(ValueError, self.b.eval_points, [1])
+        py.test.raises(ValueError, pypol.poly1d_2([[1, -1]]).eval_points, [1])
+
+    def testPartial(self):
+        p = pypol.polynomial('a^2x^3 - 2ax + 3y - a')
+        assert p.partial(a=2) == pypol.polynomial('4x^3 - 4x + 3y - 2')
+        assert p.partial(a=2, y=fractions.Fraction(1, 3)) == pypol.polynomial('4x^3 - 4x - 1')
+        assert p.partial(a=pypol.x) == p.substitute(a='x')
+        f = p.partial(a=2, evaluator=True)
+        assert f.letters == ('x', 'y')
+        assert f(3, 1) == 4*27 - 12 + 3 - 2
+        g = pypol.polynomial('ax - 2x').partial(a=2, evaluator=True)
+        assert g.letters == ('x',)
+        assert g(3) == 0
+        assert pypol.polynomial('ax - 2x').partial(x='b', evaluator=True)(2, 2) == 0
+
+    def testEvaluator(self):
+        f = self.b.evaluator()
+        assert f.letters == ('a', 'b', 'x')
+        assert [f(*v) for v in ((1, 2, 3), (0, 0, 0), (-2, 5, 1))] == [self.b(*v) for v in ((1, 2, 3), (0, 0, 0), (-2, 5, 1))]
+        assert self.a.evaluator('xy')(2, 7) == self.a(2)
+        assert pypol.polynomial('1/2x^2').evaluator()(3) == fractions.Fraction(9, 2)
+        py.test.raises(ValueError, self.b.evaluator, 'ab')
+        py.test.raises(TypeError, self.b.evaluator(), 1, 2)
+
+    def testRepresentation(self):
+        x, y = pypol.x, pypol.y
+        dense = (x + 1) ** 40
+        packed = x**1000 + 3*x**500 - 1
+        assert dense.representation == 'dense'
+        assert packed.representation == 'packed'
+        assert self.b.representation == 'sparse'
+        assert (packed * packed).representation == 'packed'
+        assert (dense * dense) == (x + 1) ** 80
+        results = []
+        for r in ('dense', 'packed', 'sparse'):
+            p, q = x**1000 + 3*x**500 - 1, x**3 - x + 2
+            p.representation = r
+            assert p.representation == r
+            assert (p * q).representation == r
+            results.append((p * q, divmod(p, q), p(2), p * q == (x**1000 + 3*x**500 - 1) * (x**3 - x + 2)))
+        assert results[0] == results[1] == results[2]
+        assert results[0][-1]
+        assert results[0][1][0] * q + results[0][1][1] == p
+        p.representation = None
+        assert p.representation == 'packed'
+        py.test.raises(ValueError, setattr, self.b, 'representation', 'dense')
+        py.test.raises(ValueError, setattr, p, 'representation', 'list')
+
     def testUpdate(self):
         self.d.update('3x - y + 2')
         assert pypol.polynomial('3x - y + 2') == self.d
@@ -202,6 +460,105 @@ class TestPolynomial(object):
         del self.a[1:3]
         assert pypol.polynomial('x^3 - 5') == self.a
 
+    def testBytes(self):
+        p = pypol.polynomial('3/2x^2y - 2.5a + 4') * pypol.poly1d_2([[1, -3]])
+        for poly in (self.a, self.b, p, pypol.NULL):
+            assert pypol.Polynomial.from_bytes(poly.to_bytes()) == poly
+        assert len(self.b.to_bytes()) < len(pickle.dumps(self.b.monomials, 2))
+        py.test.raises(ValueError, pypol.Polynomial.from_bytes, '\x00')
+
+    def testPickle(self):
+        f = pypol.AlgebraicFraction(self.a, self.c)
+        for protocol in xrange(3):
+            assert pickle.loads(pickle.dumps(self.b, protocol)) == self.b
+            assert pickle.loads(pickle.dumps(f, protocol)) == f
+
+
+class TestAlgebraicFraction(object):
+    def setup_method(self, method):
+        self.x = pypol.x
+        self.f = pypol.AlgebraicFraction(1, self.x + 1)
+
+    def testSimplify(self):
+        c, d = pypol.polynomial('12a - 6a^3'), pypol.polynomial('2a - 4a^2')
+        f = pypol.AlgebraicFraction(c, d, simplify=False)
+        assert f.terms == (c, d)
+        assert f.simplify().terms == (pypol.polynomial('-3a^2 + 6'), pypol.polynomial('-2a + 1'))
+        assert pypol.AlgebraicFraction(c, d).terms == f.terms
+        assert pypol.AlgebraicFraction(pypol.polynomial('xy'), pypol.polynomial('x^2y + x')).terms == \
+               (pypol.y, pypol.polynomial('xy + 1'))
+        py.test.raises(ZeroDivisionError, pypol.AlgebraicFraction, self.x, 0)
+
+    def testAdd(self):
+        s = self.f
+        for _ in xrange(30):
+            s = s + self.f
+        assert s._denominator == self.x + 1
+        assert s.terms == (31, self.x + 1)
+        g = pypol.AlgebraicFraction(self.x, self.x**2 - 1) - pypol.AlgebraicFraction(1, self.x - 1)
+        assert g.terms == (-1, self.x**2 - 1)
+        assert (1 - self.f).terms == (self.x, self.x + 1)
+
+    def testMul(self):
+        assert (self.f * (self.x + 1)).terms == (1, 1)
+        assert (2 / self.f).terms == (2*self.x + 2, 1)
+        assert (self.f / self.f).terms == (1, 1)
+
+    def testEq(self):
+        assert self.f == pypol.AlgebraicFraction(2, 2*self.x + 2)
+        assert self.f != pypol.AlgebraicFraction(1, self.x)
+        assert pypol.AlgebraicFraction(self.x**2 - 1, self.x - 1) == self.x + 1
+
+    def testApart(self):
+        x = self.x
+        f = pypol.AlgebraicFraction(pypol.poly1d([1, 0, 0, 0, 1]), pypol.poly1d([1, -2, 1, 0]))
+        assert f.apart() == [x + 2, pypol.AlgebraicFraction(1, x), pypol.AlgebraicFraction(2, x - 1),
+                             pypol.AlgebraicFraction(2, (x - 1)**2)]
+        g = pypol.AlgebraicFraction(pypol.polynomial('3x^5 - 2x + 7'), (x - 1)**3 * (x + 2)**2 * (x**2 + 1))
+        parts = g.apart()
+        assert len(parts) == 6
+        assert sum(parts) == g
+        assert pypol.AlgebraicFraction(x - 1, x**2 - 1).apart() == [pypol.AlgebraicFraction(1, x + 1)]
+        assert pypol.AlgebraicFraction(0, x).apart() == []
+        py.test.raises(ValueError, pypol.AlgebraicFraction(x, pypol.y).apart)
+
+    def testCall(self):
+        f = pypol.AlgebraicFraction(self.x + pypol.y, self.x - pypol.y)
+        assert f.letters == ('x', 'y')
+        assert f(3, 1) == 2
+        assert f(y=1, x=2) == 3
+        assert f(1, 1) == float('inf')
+        assert f(-1, -1) == float('-inf')
+        assert f(0, 0) != f(0, 0) # nan
+        assert f(y=2) == pypol.AlgebraicFraction(self.x + 2, self.x - 2)
+
+    def testCallOperations(self):
+        f = pypol.AlgebraicFraction(self.x + 1, self.x - 1, simplify=False)
+        g = pypol.AlgebraicFraction(self.x, self.x + 2, simplify=False)
+        F = fractions.Fraction
+        assert (f + g)(3) == F(13, 5)
+        assert (f - g)(3) == F(7, 5)
+        assert (f * g)(3) == F(6, 5)
+        assert (f / g)(3) == F(10, 3)
+        assert (f + 1)(3) == 3
+        assert (-f)(3) == -2
+        assert (+f)(3) == 2
+        assert f.invert().eval_many([3, 5]) == [F(1, 2), F(2, 3)]
+        assert copy.copy(f)(3) == 2
+    def testEvalMany(self):
+        assert self.f.eval_many([0, 1, -1, 0.5]) == [1, fractions.Fraction(1, 2), float('inf'), 1 / 1.5]
+        g = pypol.AlgebraicFraction(self.x * pypol.y, self.x + pypol.y)
+        assert g.eval_many([(1, 2), (1, -1), (2, 2)]) == [fractions.Fraction(2, 3), float('-inf'), 1]
+        assert pypol.AlgebraicFraction(3, 2).eval_many([(), ()]) == [fractions.Fraction(3, 2)] * 2
+
+    @ py.test.mark.skipif('__import__("pypol").core.numpy is None')
+    def testEvalManyNumpy(self):
+        import numpy
+        values = self.f.eval_many(numpy.array([0, 1, -1]))
+        assert list(values[:2]) == [1, 0.5] and numpy.isinf(values[2])
+        g = pypol.AlgebraicFraction(2, self.x**2 + 1)
+        assert abs(g.eval_many(numpy.array([1j, 2j]))[1] + 2 / 3.) < 1e-12
+
 
 class TestFunctions(object):
     def testPolynomial(self):
@@ -21,14 +21,26 @@ Requirements:
 - Python 2.6 (or 2.7)
 '''
 
+import fractions
+
+import pypol
 import pypol.roots as roots
+from pypol.funcs import from_roots
 
 class TestRoots(object):
     def setUp(self):
         pass
 
     def testRuffini(self):
-        pass
+        p = pypol.poly1d([1, 5, 5, -5, -6])
+        assert roots.ruffini(p) == [-3, -2, -1, 1]
+        assert roots.ruffini(from_roots([10**6, 3, -10**6])) == [-10**6, 3, 10**6]
+        assert roots.ruffini(pypol.poly1d([2, -1, 0])) == []
+
+    def testRationalRoots(self):
+        assert roots.rational_roots(pypol.poly1d([6, -5, -2, 1])) == [fractions.Fraction(-1, 2), fractions.Fraction(1, 3), 1]
+        assert roots.rational_roots(pypol.poly1d([1, 0, -2])) == []
+        assert roots.rational_roots(from_roots([10**12, -7, -7]) * pypol.poly1d([1, 0, 1])) == [-7, 10**12]
 
     def testQuadratic(self):
         pass
@@ -37,25 +49,32 @@ class TestRoots(object):
         pass
 
     def testNewton(self):
-        pass
+        p = from_roots([2, 2, 2, 2, 2, -1])
+        assert roots.newton(p, 10, sqf=True) == 2
+        assert roots.newton(p, -10, sqf=True) == -1
 
     def testHalley(self):
         pass
 
     def testHouseholder(self):
-        pass
+        p = (pypol.x + 3) * (pypol.x - 1) ** 2 * pypol.x
+        assert abs(roots.householder(p, 100) - 1) > 1e-10
+        assert roots.householder(p, 100, sqf=True) == 1
 
     def testSchroeder(self):
         pass
 
     def testLaguerre(self):
-        pass
+        p = from_roots([3, 3, 3, 1])
+        assert abs(roots.laguerre(p, 10, sqf=True) - 3) < 1e-12
 
     def testBrent(self):
         pass
 
     def testDurandKerner(self):
-        pass
+        r = roots.durand_kerner(from_roots([1, 1, 3, 3, 3, -2, 5]), sqf=True)
+        assert sorted(z.real for z in r) == [-2, 1, 1, 3, 3, 3, 5]
+        assert all(not z.imag for z in r)
 
 if __name__ == '__main__':
     import sys
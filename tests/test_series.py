@@ -213,6 +213,38 @@ class TestSeries(object):
         assert series.bern_num(14) == fractions.Fraction(7, 6)
         assert series.bern_num(16) == fractions.Fraction(-3617, 510)
         assert series.bern_num(18) == fractions.Fraction(43867, 798)
+        assert series.bern_num(60) == fractions.Fraction(-1215233140483755572040304994079820246041491, 56786730)
+
+    def testPowerSeries(self):
+        F = fractions.Fraction
+        s = series.PowerSeries([1, 1], 6)
+        assert s.order == 6
+        assert s.coefficients == [1, 1, 0, 0, 0, 0]
+        assert s.to_poly() == x + 1
+        assert series.PowerSeries(x**8 + x + 1, 3) == s.truncate(3)
+        assert (s * s).coefficients == [1, 2, 1, 0, 0, 0]
+        assert (s ** 7).coefficients == [1, 7, 21, 35, 35, 21]
+        assert (1 / s).coefficients == [1, -1, 1, -1, 1, -1]
+        assert (s * s.inverse()).coefficients == [1, 0, 0, 0, 0, 0]
+        assert (s - s).coefficients == [0] * 6
+        assert (s + series.PowerSeries([1], 2)).order == 2
+        assert s.derivative() == series.PowerSeries([1], 5)
+        assert s.integral() == series.PowerSeries([0, 1, F(1, 2)], 7)
+        assert s.sqrt().coefficients == [1, F(1, 2), F(-1, 8), F(1, 16), F(-5, 128), F(7, 256)]
+        assert s.sqrt() ** 2 == s
+        assert s ** F(1, 2) == s.sqrt()
+        assert s.log().coefficients == [0, 1, F(-1, 2), F(1, 3), F(-1, 4), F(1, 5)]
+        e = series.PowerSeries([0, 1], 8).exp()
+        assert e.coefficients == [1, 1, F(1, 2), F(1, 6), F(1, 24), F(1, 120), F(1, 720), F(1, 5040)]
+        assert (e.log() - series.PowerSeries([0, 1], 8)).coefficients == [0] * 8
+        assert e.compose(series.PowerSeries([0, 2], 8)) == e ** 2
+        assert repr(series.PowerSeries([1, 2, 3], 5)) == '+ 3x^2 + 2x + 1 + O(x^5)'
+        py.test.raises(ZeroDivisionError, series.PowerSeries([0, 1]).inverse)
+        py.test.raises(ValueError, series.PowerSeries([1, 1]).exp)
+        py.test.raises(ValueError, series.PowerSeries([2, 1]).log)
+        py.test.raises(ValueError, series.PowerSeries([2, 1]).sqrt)
+        py.test.raises(ValueError, s.compose, s)
+        py.test.raises(ValueError, series.PowerSeries, x + a)
 
     def testEuler(self):
         py.test.raises(ValueError, series.euler, -1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+'''
+
+import os
+import shutil
+import fractions
+import tempfile
+import threading
+
+import py
+import pypol
+import pypol.store as store
+import pypol.server as server
+from pypol.series import chebyshev_t
+
+class TestServer(object):
+    def setup_class(cls):
+        cls.dir = tempfile.mkdtemp()
+        path = os.path.join(cls.dir, 'chebyshev.pps')
+        store.dump(path, dict(('T%d' % n, chebyshev_t(n)) for n in xrange(20)))
+        cls.address = os.path.join(cls.dir, 'pypol.sock')
+        cls.server = server.make_server(cls.address, store=path, workers=2)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        cls.client = server.Client(cls.address, size=2)
+
+    def teardown_class(cls):
+        cls.client.close()
+        cls.server.shutdown()
+        cls.server.server_close()
+        assert not os.path.exists(cls.address)
+        shutil.rmtree(cls.dir)
+
+    def testEval(self):
+        assert self.client.ping()
+        assert self.client.eval('T4', [0, 1, 2]) == [chebyshev_t(4).evaluator('x')(v) for v in (0, 1, 2)]
+        assert self.client.eval('T3', [0.5]) == [-1.0]
+        p = pypol.polynomial('x^2y - 1/2')
+        assert self.client.eval(p, [(1, 2), (3, 1)]) == [fractions.Fraction(3, 2), fractions.Fraction(17, 2)]
+        assert self.client.eval(pypol.monomial(5), [1, 2]) == [5, 5]
+        assert self.client.eval(pypol.Polynomial(((1, {'x': -2}), (2, {'y': 1}))), [(2, 3)]) == [6.25]
+
+    def testRoots(self):
+        assert self.client.roots('T2', 'quadratic') == list(pypol.roots.quadratic(chebyshev_t(2)))
+        assert self.client.roots(pypol.poly1d([1, -3, 2]), 'ruffini') == [1, 2]
+        root = self.client.roots('T3', 'newton', start=1, epsilon=1e-12)
+        assert len(root) == 1 and abs(root[0] - 3 ** .5 / 2) < 1e-12
+
+    def testErrors(self):
+        py.test.raises(server.ServerError, self.client.eval, 'T100', [1])
+        py.test.raises(server.ServerError, self.client.eval, 'T2', [(1, 2)])
+        py.test.raises(server.ServerError, self.client.roots, 'T2', 'system')
+        py.test.raises(ValueError, self.client.eval, 'T2', [(1, 2), (1,)])
+        assert self.client.eval('T1', [3]) == [3]
+
+    def testPipeline(self):
+        p = self.client.pipeline()
+        for n in xrange(20):
+            p.eval('T%d' % n, [2])
+        p.eval('T100', [2])
+        p.ping()
+        assert len(p) == 22
+        results = p.execute()
+        assert results[:20] == [[chebyshev_t(n).evaluator('x')(2)] for n in xrange(20)]
+        assert isinstance(results[20], server.ServerError) and 'T100' in str(results[20])
+        assert results[21] == []
+        assert len(p) == 0 and p.execute() == []
+
+    def testThreads(self):
+        errors = []
+        def _run(k):
+            try:
+                for n in xrange(20):
+                    assert self.client.eval('T%d' % n, [k]) == [chebyshev_t(n).evaluator('x')(k)]
+            except Exception, e:
+                errors.append(e)
+        threads = [threading.Thread(target=_run, args=(k,)) for k in xrange(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert self.client._open <= 2
+
+    def testFailureWakesWaiters(self):
+        client = server.Client(self.address, size=1)
+        sock = client._acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(client.ping()))
+        waiter.daemon = True
+        waiter.start()
+        waiter.join(.2)
+        assert waiter.is_alive() ## All the connections are busy
+        sock.close() ## What Client._call does when a request fails
+        client._release(None)
+        waiter.join(5)
+        assert not waiter.is_alive()
+        assert results == [True] and client._open == 1
+        client.close()
+        assert client._open == 0
+
+if __name__ == '__main__':
+    import sys
+    import os.path
+    py.test.main(args=[os.path.abspath(__file__)] + sys.argv[1:])
@@ -0,0 +1,81 @@
+#!/usr/bin/env python2.6
+# -*- coding: utf-8 -*-
+
+'''
+pypol - a Python library to manipulate polynomials and algebraic fractions.
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation; either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Requirements:
+- Python 2.6 (or 2.7)
+'''
+
+import os
+import shutil
+import tempfile
+
+import py
+import pypol
+import pypol.store as store
+from pypol.series import chebyshev_t
+
+class TestStore(object):
+    def setup_method(self, method):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'test.pps')
+        self.polys = dict(('T%d' % n, chebyshev_t(n)) for n in xrange(30))
+        self.polys[u'\xe0'] = pypol.polynomial('3/2a^2 - b + 2.5')
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.dir)
+
+    def testRoundTrip(self):
+        store.dump(self.path, self.polys)
+        s = store.PolynomialStore(self.path)
+        assert len(s) == len(self.polys)
+        assert sorted(s.keys()) == sorted(store._key(k) for k in self.polys)
+        for key, poly in self.polys.iteritems():
+            assert key in s
+            assert s[key] == poly
+            assert pypol.Polynomial.from_bytes(s.view(key)) == poly
+        assert 'T30' not in s
+        assert s.get('T30') is None
+        py.test.raises(KeyError, lambda: s['T30'])
+        s.close()
+
+    def testEmpty(self):
+        store.dump(self.path, [])
+        with store.PolynomialStore(self.path) as s:
+            assert len(s) == 0
+            assert 'T1' not in s
+
+    def testWriter(self):
+        w = store.StoreWriter(self.path)
+        w.add('a', pypol.x)
+        py.test.raises(ValueError, w.add, 'a', pypol.ONE)
+        py.test.raises(ValueError, store.PolynomialStore, self.path)
+        w.close()
+        assert store.PolynomialStore(self.path)['a'] == pypol.x
+
+    def testNotAStore(self):
+        open(self.path, 'wb').close()
+        py.test.raises(ValueError, store.PolynomialStore, self.path)
+        with open(self.path, 'wb') as f:
+            f.write('not a polynomial store at all')
+        py.test.raises(ValueError, store.PolynomialStore, self.path)
+
+if __name__ == '__main__':
+    import sys
+    import os.path
+    py.test.main(args=[os.path.abspath(__file__)] + sys.argv[1:])
\ No newline at end of file